@@ -1,60 +1,14 @@
-def create_agents_and_tasks(teacher_df, room_df):
-    llm = ChatGoogleGenerativeAI(model="gemini-pro")
-
-    data_gatherer = Agent(
-        role='Data Gathering Expert',
-        goal='Gather and organize all required data from provided excel sheets',
-        backstory='An expert in extracting information from datasets.',
-        llm=llm
-    )
-
-    scheduler = Agent(
-        role='Timetable Scheduler',
-        goal='Create an initial timetable based on the data, applying all provided constraints.',
-        backstory='A very skilled scheduler who takes constraints very seriously.',
-        llm=llm
-    )
-
-    conflict_resolver = Agent(
-        role='Conflict Resolver',
-        goal='Identify and resolve scheduling conflicts, ensuring no violations.',
-        backstory='An extremely detail-oriented conflict resolver with expertise in timetables.',
-        llm=llm
-    )
-
-    output_generator = Agent(
-        role="Output Generator",
-        goal='Format the final timetable in a proper output file (Excel)',
-        backstory="Expert at file formatting and data handling.",
-        llm=llm
-    )
-
-    data_gathering_task = Task(
-        description=f"Collect all data about the teachers, courses, allocated labs, and available rooms from the given data and write it as a JSON string. Teachers data: {teacher_df.to_json()}, room data: {room_df.to_json()}",
-        agent=data_gatherer
-    )
-
-    scheduling_task = Task(
-         description="""Generate a tentative timetable based on the data gathered from Data Gatherer while respecting all of the constraints provided below.
-            Constraints to follow:
-            1. Every Theory Lecture is of 1 hour and 15 minutes.
-            2. University first lecture starts at 8 am and ends at 6:30 pm, including Saturday.
-            3. There is a 15-minute break between every lecture.
-            4. The first lecture is between 8 am to 9:15 am and then the second lecture will start from 9:30 to 10:45 am and so on.
-            5. Every lab is a combination of 2 lectures (it will be 2 hours and 30 minutes long).
-            6. Labs will only happen once a week.
-            7. Theory lectures will happen twice a week.
-            8. There is no lecture from 12:30 to 2 pm on Friday.
-            9. There are 3 types of labs: Hardware, Computing, and Physics labs, and they must be allocated to their respective locations.
-            Output: Output a json string of a timetable.
-        """,
-        agent=scheduler
-    )
+import json
+
+from crew_stages import StageRunner
+from lazy_imports import timed_import
+from prompt_encoding import LEGEND_NOTE, encode_rooms, encode_teachers
+from schedule_models import CourseAnalysis, SchedulePlan
+from timetable_cache import TimetableCache
 
+MODEL_NAME = "gemini-pro"
 
-    conflict_resolution_task = Task(
-        description="""Identify and resolve any conflicts in the tentative timetable. Make sure there is no teacher, room, or lab clash.
-            Constraints to follow:
+CONSTRAINTS = """Constraints to follow:
             1. Every Theory Lecture is of 1 hour and 15 minutes.
             2. University first lecture starts at 8 am and ends at 6:30 pm, including Saturday.
             3. There is a 15-minute break between every lecture.
@@ -63,24 +17,118 @@ def create_agents_and_tasks(teacher_df, room_df):
             6. Labs will only happen once a week.
             7. Theory lectures will happen twice a week.
             8. There is no lecture from 12:30 to 2 pm on Friday.
-            9. There are 3 types of labs: Hardware, Computing, and Physics labs, and they must be allocated to their respective locations.
-            Output: Output a JSON string of a conflict-free timetable.
+            9. There are 3 types of labs: Hardware, Computing, and Physics labs, and they must be allocated to their respective locations."""
+
+
+def _compact(records) -> str:
+    """Only non-default fields, as compact JSON, to keep stage prompts small"""
+    return json.dumps([record.model_dump(mode='json', exclude_defaults=True) for record in records],
+                      separators=(',', ':'))
+
+
+class TimetableCrew:
+    """Data gathering -> scheduling -> conflict resolution as cached, typed stages.
+
+    Each stage is its own single-task crew: data gathering returns a
+    CourseAnalysis, scheduling and conflict resolution return SchedulePlans,
+    and each payload is the input of the next stage. Stage results are
+    cached by a hash of their input, and `stages.report` times every stage.
+    """
+
+    def __init__(self, teacher_df, room_df, cache=None):
+        self.teacher_df = teacher_df
+        self.room_df = room_df
+        self.stages = StageRunner(cache)
+        # Heavy SDKs are imported on first use (usually already warmed up by env_setup)
+        crewai = timed_import('crewai')
+        self.Agent, self.Task = crewai.Agent, crewai.Task
+        llm = timed_import('langchain_google_genai').ChatGoogleGenerativeAI(model=MODEL_NAME)
+
+        self.data_gatherer = self.Agent(
+            role='Data Gathering Expert',
+            goal='Gather and organize all required data from provided excel sheets',
+            backstory='An expert in extracting information from datasets.',
+            llm=llm
+        )
+
+        self.scheduler = self.Agent(
+            role='Timetable Scheduler',
+            goal='Create an initial timetable based on the data, applying all provided constraints.',
+            backstory='A very skilled scheduler who takes constraints very seriously.',
+            llm=llm
+        )
+
+        self.conflict_resolver = self.Agent(
+            role='Conflict Resolver',
+            goal='Identify and resolve scheduling conflicts, ensuring no violations.',
+            backstory='An extremely detail-oriented conflict resolver with expertise in timetables.',
+            llm=llm
+        )
+
+    def data_gathering_task(self):
+        return self.Task(
+            description=f"Collect all data about the teachers, courses and allocated labs from the given data. Teachers data:\n{encode_teachers(self.teacher_df)}\n{LEGEND_NOTE}",
+            agent=self.data_gatherer,
+            expected_output='One entry per course with name, code, course_type, teachers and weekly_frequency',
+            output_pydantic=CourseAnalysis
+        )
+
+    def scheduling_task(self, analysis):
+        return self.Task(
+            description=f"""Generate a tentative timetable for the courses below while respecting all of the constraints provided below.
+            Courses: {_compact(analysis.courses)}
+            Room data:
+            {encode_rooms(self.room_df)}
+            {LEGEND_NOTE}
+            {CONSTRAINTS}
+        """,
+            agent=self.scheduler,
+            expected_output='One entry per weekly session with the course fields plus assigned_teacher, assigned_room, '
+                            'assigned_day and assigned_time_slot ({"start", "end"} as HH:MM)',
+            output_pydantic=SchedulePlan
+        )
+
+    def conflict_resolution_task(self, plan):
+        return self.Task(
+            description=f"""Identify and resolve any conflicts in the tentative timetable. Make sure there is no teacher, room, or lab clash.
+            Tentative timetable: {_compact(plan.scheduled_courses)}
+            Room data:
+            {encode_rooms(self.room_df)}
+            {LEGEND_NOTE}
+            {CONSTRAINTS}
         """,
-        agent=conflict_resolver
-    )
-
-    output_generation_task = Task(
-         description="""Format the given timetable data to generate a proper excel file with each column named correctly and a named sheet.
-            Make sure the output is an Excel file that can be directly downloaded by the user.
-            Input:{timetable}
-            Output: The output will be a valid Excel file.
-         """,
-        agent=output_generator,
-     )
-
-    crew = Crew(
-        agents=[data_gatherer, scheduler, conflict_resolver, output_generator],
-        tasks=[data_gathering_task, scheduling_task, conflict_resolution_task, output_generation_task],
-        process=Process.sequential,
-    )
-    return crew
\ No newline at end of file
+            agent=self.conflict_resolver,
+            expected_output='The conflict-free timetable, one entry per weekly session, in the same format',
+            output_pydantic=SchedulePlan
+        )
+
+    def kickoff(self) -> SchedulePlan:
+        self.stages.report = []
+        analysis = self.stages.run(
+            'Data gathering',
+            TimetableCache.key(self.teacher_df, stage='data_gathering', model=MODEL_NAME),
+            self.data_gatherer,
+            self.data_gathering_task(),
+            CourseAnalysis
+        )
+        tentative = self.stages.run(
+            'Scheduling',
+            TimetableCache.key(self.room_df, stage='scheduling', model=MODEL_NAME,
+                               courses=analysis.model_dump(mode='json')),
+            self.scheduler,
+            self.scheduling_task(analysis),
+            SchedulePlan
+        )
+        # The pipeline ends at the typed conflict-free plan; timetable_formatter turns it into a table locally
+        return self.stages.run(
+            'Conflict resolution',
+            TimetableCache.key(self.room_df, stage='conflict_resolution', model=MODEL_NAME,
+                               plan=tentative.model_dump(mode='json')),
+            self.conflict_resolver,
+            self.conflict_resolution_task(tentative),
+            SchedulePlan
+        )
+
+
+def create_agents_and_tasks(teacher_df, room_df, cache=None):
+    return TimetableCrew(teacher_df, room_df, cache)
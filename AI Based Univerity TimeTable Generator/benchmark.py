@@ -0,0 +1,221 @@
+"""Offline benchmark for the timetable placement engines.
+
+Generates synthetic universities of a given size, runs each engine on the
+same course list and reports placement throughput, failure rate, validator
+time and peak memory. The LLM is replaced by a stub that answers the course
+metadata prompt from the generator's ground truth, so nothing leaves the
+machine. Results are written as JSON for regression tracking:
+
+    python benchmark.py --sections 100 1000 10000 --engines solver hybrid --output results.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+
+import pandas as pd
+
+from hybrid_scheduler import HybridTimetableBuilder
+from scheduling_agent import SchedulingAgent
+from solver import LAB_SLOT_SPAN, weekly_sessions
+from timetable_validator import validate_timetable
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+BASE_TIME_SLOTS = [
+    {"start": "08:00", "end": "09:15"},
+    {"start": "09:30", "end": "10:45"},
+    {"start": "11:00", "end": "12:15"},
+    {"start": "12:30", "end": "13:45"},
+    {"start": "14:00", "end": "15:15"},
+    {"start": "15:30", "end": "16:45"},
+    {"start": "17:00", "end": "18:15"}
+]
+BLOCKED_SLOTS = [("Friday", "12:30")]
+DEPARTMENTS = ['Computer Science', 'Electrical Engineering', 'Mathematics', 'Physics']
+LAB_TYPES = ['Hardware Lab', 'Computing Lab', 'Physics Lab']
+ROOM_FOR_TYPE = {'Theory': 'Lecture Hall', 'Hardware Lab': 'Hardware Lab',
+                 'Computing Lab': 'Computing Lab', 'Physics Lab': 'Physics Lab'}
+
+
+def synthetic_university(sections: int, lab_share: float = 0.3, lab_mix: Sequence[float] = (1, 1, 1),
+                         teacher_load: int = 4, utilisation: float = 0.6, seed: int = 0):
+    """Return (teachers_df, rooms_df, class_sizes) shaped like the uploaded sheets.
+
+    Every teachers row is one section with its own course code. `lab_share`
+    of the sections are labs, split across lab types by `lab_mix`; each
+    teacher teaches about `teacher_load` sections. Rooms per type are sized
+    so the type's weekly slot demand fills `utilisation` of its capacity.
+    """
+    rng = random.Random(seed)
+    teachers = max(1, math.ceil(sections / teacher_load))
+    usable_slots = len(DAYS) * len(BASE_TIME_SLOTS) - len(BLOCKED_SLOTS)
+
+    rows, class_sizes, demand = [], {}, {}
+    for n in range(sections):
+        department = DEPARTMENTS[n % len(DEPARTMENTS)]
+        course_type = rng.choices(LAB_TYPES, weights=lab_mix)[0] if rng.random() < lab_share else 'Theory'
+        code = f"{department[:2].upper()}{n:05d}"
+        class_sizes[code] = rng.randint(15, 30) if course_type != 'Theory' else rng.randint(20, 80)
+        rows.append({
+            'Name': f"Teacher {rng.randrange(teachers):04d}",
+            'Course': f"{course_type} course {n}",
+            'Course Code': code,
+            'Course Type': course_type,
+            'Department': department,
+        })
+        room_type = ROOM_FOR_TYPE[course_type]
+        demand[room_type] = demand.get(room_type, 0) + (LAB_SLOT_SPAN if course_type != 'Theory' else 2)
+
+    room_rows = []
+    for room_type, slots in demand.items():
+        largest = 30 if room_type != 'Lecture Hall' else 80
+        for k in range(max(1, math.ceil(slots / (usable_slots * utilisation)))):
+            room_rows.append({
+                'Room Name': f"{room_type} {k + 1}",
+                'Room Type': room_type,
+                'Capacity': largest if k % 2 == 0 else rng.randint(largest // 2, largest),
+            })
+    return pd.DataFrame(rows), pd.DataFrame(room_rows), class_sizes
+
+
+class StubLLM:
+    """Answers the course metadata prompt from known class sizes, without network access"""
+
+    def __init__(self, class_sizes: Dict[str, int]):
+        self.class_sizes = class_sizes
+        self.calls = 0
+
+    def __call__(self, prompt: str) -> str:
+        self.calls += 1
+        answer = []
+        for line in prompt.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 4 and parts[0] in self.class_sizes:
+                answer.append({'CourseCode': parts[0], 'CourseType': parts[2],
+                               'WeeklyFrequency': 1 if 'Lab' in parts[2] else 2,
+                               'ClassSize': self.class_sizes[parts[0]]})
+        return json.dumps(answer)
+
+
+def _records_to_timetable(schedule: List[Dict]) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            'Day': record['assigned_day'],
+            'StartTime': record['assigned_time_slot']['start'],
+            'EndTime': record['assigned_time_slot']['end'],
+            'CourseCode': record['code'],
+            'CourseType': record['course_type'],
+            'Room': record['assigned_room'],
+            'Teacher': record['assigned_teacher'],
+        }
+        for record in schedule
+    ], columns=['Day', 'StartTime', 'EndTime', 'CourseCode', 'CourseType', 'Room', 'Teacher'])
+
+
+def _scheduling_agent_engine(mode: str) -> Callable:
+    def run(courses, teachers_df, rooms_df, seed):
+        agent = SchedulingAgent(rooms_df, teachers_df, mode=mode, seed=seed)
+        return _records_to_timetable(agent.schedule_courses(courses))
+    return run
+
+
+def _hybrid_engine(courses, teachers_df, rooms_df, seed):
+    builder = HybridTimetableBuilder(None, DAYS, BASE_TIME_SLOTS, BLOCKED_SLOTS, seed=seed)
+    timetable_df, _ = builder.place(courses, rooms_df, teachers_df)
+    return timetable_df
+
+
+ENGINES = {
+    'random': _scheduling_agent_engine('random'),
+    'solver': _scheduling_agent_engine('solver'),
+    'hybrid': _hybrid_engine,
+}
+
+
+def run_case(engine: str, sections: int, measure_memory: bool = True, seed: int = 0, **generator_options) -> Dict:
+    teachers_df, rooms_df, class_sizes = synthetic_university(sections, seed=seed, **generator_options)
+    llm = StubLLM(class_sizes)
+    courses = HybridTimetableBuilder(llm, DAYS, BASE_TIME_SLOTS).infer_courses(teachers_df)
+    requested = sum(weekly_sessions(course) for course in courses)
+    run = ENGINES[engine]
+
+    started = time.perf_counter()
+    timetable_df = run(courses, teachers_df, rooms_df, seed)
+    place_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    violations = validate_timetable(timetable_df, rooms_df)
+    validate_seconds = time.perf_counter() - started
+
+    peak_mb = None
+    if measure_memory:
+        # Separate pass: tracemalloc slows allocation-heavy code, so it must not skew the timings
+        tracemalloc.start()
+        run(courses, teachers_df, rooms_df, seed)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    placed = len(timetable_df)
+    return {
+        'engine': engine,
+        'sections': sections,
+        'teachers': teachers_df['Name'].nunique(),
+        'rooms': len(rooms_df),
+        'sessions_requested': requested,
+        'sessions_placed': placed,
+        'failure_rate': round(1 - placed / requested, 4) if requested else 0.0,
+        'place_seconds': round(place_seconds, 4),
+        'sessions_per_second': round(placed / place_seconds, 1) if place_seconds else None,
+        'validate_seconds': round(validate_seconds, 4),
+        'violations': len(violations),
+        'peak_memory_mb': round(peak_mb, 2) if peak_mb is not None else None,
+        'stub_llm_calls': llm.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=['random', 'solver', 'hybrid'])
+    parser.add_argument('--lab-share', type=float, default=0.3)
+    parser.add_argument('--lab-mix', type=float, nargs=3, default=[1, 1, 1],
+                        metavar=('HARDWARE', 'COMPUTING', 'PHYSICS'))
+    parser.add_argument('--teacher-load', type=int, default=4)
+    parser.add_argument('--utilisation', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    results = []
+    for sections in args.sections:
+        for engine in args.engines:
+            result = run_case(
+                engine, sections, measure_memory=not args.no_memory, seed=args.seed,
+                lab_share=args.lab_share, lab_mix=args.lab_mix,
+                teacher_load=args.teacher_load, utilisation=args.utilisation
+            )
+            results.append(result)
+            print(f"{engine:>7} {sections:>6} sections: {result['sessions_placed']}/{result['sessions_requested']} placed "
+                  f"in {result['place_seconds']:.2f}s ({result['sessions_per_second']}/s), "
+                  f"validator {result['validate_seconds']:.2f}s, {result['violations']} violations, "
+                  f"peak {result['peak_memory_mb']} MB")
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'parameters': vars(args),
+            'results': results,
+        }, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,27 @@
 # conda activate "D:\Python_Projects\AI Timetable\aitimetable"
 import os
-import json
-import random
+import time
 import logging
 import pandas as pd
 import streamlit as st
-from typing import List, Optional, Dict
 from dotenv import load_dotenv
-from enum import Enum
-from pydantic import BaseModel, Field
 
-# CrewAI Imports
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import BaseTool
-from crewai.llm import Gemini
+# Local Imports
+from lazy_imports import startup_report, timed_import, warm_up
+from scheduling_agent import SchedulingAgent, SchedulingSettings
+from ingestion import load_sheet, with_course_groups
+from prompt_encoding import LEGEND_NOTE, encode_rooms, encode_teachers
+from timetable_export import export_timetable
+from timetable_cache import TimetableCache
+from agent_setup import _compact
+from crew_stages import StageRunner
+from schedule_models import CourseAnalysis, SchedulePlan
 
-# Google AI Imports
-import google.generativeai as genai
+# Start of this script run, for the startup-time report
+RUN_STARTED = time.perf_counter()
+
+# CrewAI and the Google AI SDK take seconds to import; they are loaded on first use
+HEAVY_MODULES = ('crewai', 'google.generativeai')
 
 # Load environment variables
 load_dotenv()
@@ -26,47 +31,17 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(m
 logger = logging.getLogger(__name__)
 
 # Configuration
-class Settings:
+class Settings(SchedulingSettings):
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
-    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    BASE_TIME_SLOTS = [
-        {"start": "08:00", "end": "09:15"},
-        {"start": "09:30", "end": "10:45"},
-        {"start": "11:00", "end": "12:15"},
-        {"start": "12:30", "end": "13:45"},
-        {"start": "14:00", "end": "15:15"},
-        {"start": "15:30", "end": "16:45"},
-        {"start": "17:00", "end": "18:15"}
-    ]
-
-# Enums and Models
-class CourseType(str, Enum):
-    THEORY = "Theory"
-    HARDWARE_LAB = "Hardware Lab"
-    COMPUTING_LAB = "Computing Lab"
-    PHYSICS_LAB = "Physics Lab"
-
-class Course(BaseModel):
-    name: str
-    code: str
-    course_type: CourseType
-    teachers: List[str]
-    required_rooms: List[str] = []
-    weekly_frequency: int = 2
-    duration: int = 75
-
-class ScheduledCourse(Course):
-    assigned_teacher: Optional[str] = None
-    assigned_room: Optional[str] = None
-    assigned_day: Optional[str] = None
-    assigned_time_slot: Optional[Dict] = None
+    MODEL_NAME = 'gemini-2.0-flash-exp'
 
 # AI and Data Handling Utilities
 class GeminiHandler:
     def __init__(self):
+        genai = timed_import('google.generativeai')
         genai.configure(api_key=Settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        self.llm = Gemini(api_key=Settings.GOOGLE_API_KEY)
+        self.model = genai.GenerativeModel(Settings.MODEL_NAME)
+        self.llm = timed_import('crewai.llm').Gemini(api_key=Settings.GOOGLE_API_KEY)
 
     def generate_intelligent_response(self, prompt, temperature=0.7):
         try:
@@ -82,15 +57,27 @@ class GeminiHandler:
             logger.error(f"Gemini Generation Error: {e}")
             return None
 
+@st.cache_resource
+def get_gemini_handler():
+    """One GeminiHandler, and so one set of SDK clients, per process across all sessions and reruns"""
+    return GeminiHandler()
+
+@st.cache_resource
+def start_sdk_warm_up():
+    """Import the heavy SDKs in the background once per process while the user uploads files"""
+    return warm_up(HEAVY_MODULES)
+
 # CrewAI Agents
 class UniversitySchedulerCrew:
-    def __init__(self, teachers_df, rooms_df):
+    def __init__(self, teachers_df, rooms_df, cache=None):
         self.teachers_df = teachers_df
         self.rooms_df = rooms_df
-        self.gemini_handler = GeminiHandler()
+        self.gemini_handler = get_gemini_handler()
+        # Runs and caches each stage; its report has one row per stage
+        self.stages = StageRunner(cache)
 
     def create_course_analysis_agent(self):
-      return Agent(
+      return timed_import('crewai').Agent(
             role='Course Data Analyst',
             goal='Analyze and extract detailed insights from course and teacher data',
             backstory='An expert in academic course planning with deep understanding of curriculum design and resource allocation',
@@ -100,7 +87,7 @@ class UniversitySchedulerCrew:
         )
 
     def create_scheduling_agent(self):
-        return Agent(
+        return timed_import('crewai').Agent(
             role='University Scheduler',
             goal='Create an optimal and conflict-free course schedule',
             backstory='A strategic scheduler who ensures efficient use of resources, teacher availability, and student learning experience',
@@ -110,10 +97,11 @@ class UniversitySchedulerCrew:
         )
 
     def course_analysis_task(self, agent):
-        return Task(
+        return timed_import('crewai').Task(
             description=f"""
             Analyze the course data and provide intelligent insights:
-            {self.teachers_df.to_json(orient='records')}
+            {encode_teachers(self.teachers_df)}
+            {LEGEND_NOTE}
 
             For each course, systematically determine:
             1. Precise course type
@@ -121,15 +109,17 @@ class UniversitySchedulerCrew:
             3. Recommended weekly frequency
             4. Potential room requirements
             5. Suitable teachers for each course
+            6. Expected class size (number of students)
 
             Ensure comprehensive and structured analysis.
             """,
             agent=agent,
-            expected_output='Detailed JSON with course insights'
+            expected_output='One entry per course with name, code, course_type, teachers, weekly_frequency and class_size',
+            output_pydantic=CourseAnalysis
         )
 
-    def scheduling_task(self, agent, analyzed_courses):
-        return Task(
+    def scheduling_task(self, agent, analysis):
+        return timed_import('crewai').Task(
             description=f"""
             Create a comprehensive university course schedule based on analyzed courses.
             Constraints to consider:
@@ -138,156 +128,109 @@ class UniversitySchedulerCrew:
             - Minimize scheduling conflicts
             - Ensure optimal distribution across days and time slots
             
-            Analyzed Courses: {json.dumps(analyzed_courses, indent=2)}
+            Analyzed Courses: {_compact(analysis.courses)}
+
+            Rooms:
+            {encode_rooms(self.rooms_df)}
+            {LEGEND_NOTE}
             """,
             agent=agent,
-            expected_output='Detailed course scheduling plan'
+            expected_output='Every analyzed course with its assigned teacher, room, day and time slot',
+            output_pydantic=SchedulePlan
         )
 
     def generate_intelligent_schedule(self):
-        course_analysis_agent = self.create_course_analysis_agent()
-        scheduling_agent = self.create_scheduling_agent()
-
-        course_analysis_task = self.course_analysis_task(course_analysis_agent)
-        
-        crew = Crew(
-            agents=[course_analysis_agent, scheduling_agent],
-            tasks=[course_analysis_task],
-            process=Process.sequential
-        )
-
-        # Initial course analysis
-        course_analysis_result = crew.kickoff()
-        
+        """Course analysis -> scheduling, each stage cached by a hash of its input payload"""
+        self.stages.report = []
         try:
-            analyzed_courses = json.loads(course_analysis_result)
-            
-            # Scheduling task
-            scheduling_task = self.scheduling_task(scheduling_agent, analyzed_courses)
-            crew.tasks = [scheduling_task]
-            
-            scheduling_result = crew.kickoff()
-            return scheduling_result
+            course_analysis_agent = self.create_course_analysis_agent()
+            analysis = self.stages.run(
+                'Course analysis',
+                TimetableCache.key(self.teachers_df, stage='course_analysis', model=Settings.MODEL_NAME),
+                course_analysis_agent,
+                self.course_analysis_task(course_analysis_agent),
+                CourseAnalysis
+            )
+
+            scheduling_agent = self.create_scheduling_agent()
+            plan = self.stages.run(
+                'Scheduling',
+                TimetableCache.key(
+                    self.rooms_df, stage='scheduling', model=Settings.MODEL_NAME,
+                    courses=analysis.model_dump(mode='json')
+                ),
+                scheduling_agent,
+                self.scheduling_task(scheduling_agent, analysis),
+                SchedulePlan
+            )
+            return [course.model_dump(mode='json') for course in plan.scheduled_courses]
         except Exception as e:
             logger.error(f"Scheduling generation error: {e}")
             return None
 
-# Scheduling Logic
-class SchedulingAgent:
-    def __init__(self, rooms_df, teachers_df):
-        self.rooms_df = rooms_df
-        self.teachers_df = teachers_df
-        self.room_occupancy = {}
-        self.teacher_occupancy = {}
-        self.initialize_occupancy_tracking()
-
-    def initialize_occupancy_tracking(self):
-        for day in Settings.DAYS:
-            self.room_occupancy[day] = {
-                slot['start']: [] for slot in Settings.BASE_TIME_SLOTS
-            }
-            self.teacher_occupancy[day] = {
-                slot['start']: [] for slot in Settings.BASE_TIME_SLOTS
-            }
-
-    def schedule_courses(self, courses):
-        scheduled_courses = []
-        for course in courses:
-            scheduled_course = self.schedule_course(course)
-            if scheduled_course:
-                scheduled_courses.append(scheduled_course)
-        return scheduled_courses
-
-    def schedule_course(self, course):
-        possible_rooms = self._get_suitable_rooms(course['course_type'])
-        
-        for _ in range(course.get('weekly_frequency', 2)):
-            scheduled = False
-            attempts = 0
-            
-            while not scheduled and attempts < 20:
-                day = random.choice(Settings.DAYS)
-                time_slot = random.choice(Settings.BASE_TIME_SLOTS)
-                room = random.choice(possible_rooms)
-                teacher = random.choice(course['teachers'])
-                
-                if self._is_slot_available(day, time_slot, room, teacher):
-                    # Mark occupancy
-                    self.room_occupancy[day][time_slot['start']].append(room)
-                    self.teacher_occupancy[day][time_slot['start']].append(teacher)
-                    
-                    # Get full teacher details
-                    teacher_details = self.teachers_df[self.teachers_df['Name'] == teacher].iloc[0]
-                    
-                    return {
-                        **course,
-                        'assigned_teacher': teacher,
-                        'teacher_department': teacher_details['Department'] if 'Department' in self.teachers_df.columns else 'N/A',
-                        'assigned_room': room,
-                        'assigned_day': day,
-                        'assigned_time_slot': time_slot
-                    }
-                
-                attempts += 1
-        
-        return None
-
-    def _is_slot_available(self, day: str, time_slot: dict, room: str, teacher: str) -> bool:
-        # Check room availability
-        if room in self.room_occupancy[day][time_slot['start']]:
-            return False
-        
-        # Check teacher availability
-        if teacher in self.teacher_occupancy[day][time_slot['start']]:
-            return False
-        
-        # Special Friday constraint can be added if needed
-        return True
-
-    def _get_suitable_rooms(self, course_type: str) -> List[str]:
-        room_type_mapping = {
-            'Theory': 'Lecture Hall',
-            'Hardware Lab': 'Hardware Lab',
-            'Computing Lab': 'Computing Lab',
-            'Physics Lab': 'Physics Lab'
-        }
-        
-        return self.rooms_df[
-            self.rooms_df['Room Type'] == room_type_mapping.get(course_type, 'Lecture Hall')
-        ]['Room Name'].tolist()
-
 # Streamlit Application
 def main():
     st.title("🎓 CrewAI Intelligent University Scheduler")
+    start_sdk_warm_up()
     
     # File uploaders
-    teachers_file = st.file_uploader("Upload Teachers Excel", type=['xlsx'])
-    rooms_file = st.file_uploader("Upload Rooms Excel", type=['xlsx'])
+    teachers_file = st.file_uploader("Upload Teachers Excel, CSV or Parquet", type=['xlsx', 'csv', 'parquet'])
+    rooms_file = st.file_uploader("Upload Rooms Excel, CSV or Parquet", type=['xlsx', 'csv', 'parquet'])
 
     if teachers_file and rooms_file:
         # Load data
         try:
-            teachers_df = pd.read_excel(teachers_file)
-            rooms_df = pd.read_excel(rooms_file)
+            teachers_df = load_sheet(teachers_file, ['Name', 'Course', 'Course Code', 'Course Type'], 'Teachers')
+            rooms_df = load_sheet(rooms_file, ['Room Name', 'Room Type'], 'Rooms')
 
             # Add Department column if not exists
             if 'Department' not in teachers_df.columns:
                 teachers_df['Department'] = 'General'
 
+            engine = st.radio("Placement engine", ["Constraint solver", "Random retry"])
+            seed = st.number_input("Seed", min_value=0, value=0, step=1)
+            time_budget = st.slider("Optimization time budget (seconds)", 0, 60, 5)
+            parallel_runs = st.number_input("Parallel solver runs", min_value=1, value=1, step=1)
+
             if st.button("Generate Intelligent Schedule"):
                 # Initialize CrewAI Scheduler
                 crew_scheduler = UniversitySchedulerCrew(teachers_df, rooms_df)
                 
-                # Generate intelligent schedule
-                scheduling_result = crew_scheduler.generate_intelligent_schedule()
+                # Generate intelligent schedule; unchanged stages are served from the cache
+                analyzed_courses = crew_scheduler.generate_intelligent_schedule()
+                if analyzed_courses:
+                    # Semester/elective come from the sheet when it has them, not from the LLM
+                    analyzed_courses = with_course_groups(analyzed_courses, teachers_df)
+                if crew_scheduler.stages.report:
+                    st.write("### Crew Stages")
+                    st.dataframe(pd.DataFrame(crew_scheduler.stages.report))
                 
                 # Process scheduling result
-                scheduling_agent = SchedulingAgent(rooms_df, teachers_df)
+                scheduling_agent = SchedulingAgent(
+                    rooms_df,
+                    teachers_df,
+                    mode='solver' if engine == "Constraint solver" else 'random',
+                    seed=int(seed)
+                )
                 
-                if scheduling_result:
-                    # Parse results
-                    analyzed_courses = json.loads(scheduling_result)
-                    final_schedule = scheduling_agent.schedule_courses(analyzed_courses)
+                if analyzed_courses:
+                    # Multi-start runs include the local search stage in every worker
+                    multistart = engine == "Constraint solver" and parallel_runs > 1
+                    if multistart:
+                        final_schedule, run_stats = scheduling_agent.schedule_courses_multistart(
+                            analyzed_courses, runs=int(parallel_runs), time_budget=time_budget
+                        )
+                        st.write("### Solver Runs")
+                        st.dataframe(pd.DataFrame(run_stats))
+                    else:
+                        final_schedule = scheduling_agent.schedule_courses(analyzed_courses)
+                    if time_budget > 0 and not multistart:
+                        final_schedule, cost_report = scheduling_agent.improve_schedule(final_schedule, time_budget)
+                        st.write("### Soft Constraint Cost")
+                        st.dataframe(pd.DataFrame({
+                            'Before': {k: v['cost'] for k, v in cost_report['initial'].items() if k != 'total'},
+                            'After': {k: v['cost'] for k, v in cost_report['final'].items() if k != 'total'}
+                        }))
                     
                     # Display schedule
                     schedule_df = pd.DataFrame([
@@ -304,17 +247,28 @@ def main():
                     ])
                     
                     st.dataframe(schedule_df)
+
+                    for core in scheduling_agent.infeasible:
+                        clashes = ", ".join(
+                            f"{c['code']} ({c['day']} {c['time_slot']['start']}, {c['teacher']}, {c['room']})"
+                            for c in core['conflicts_with']
+                        )
+                        st.warning(
+                            f"Could not place {core['course'].get('code')} session {core['session'] + 1}: "
+                            f"{core['reason']}" + (f". Blocked by: {clashes}" if clashes else "")
+                        )
                     
                     # Download option
                     @st.cache_data
                     def convert_df(df):
-                        return df.to_excel('intelligent_university_schedule.xlsx', index=False)
+                        return export_timetable(df, 'xlsx', views=('Teacher Name', 'Room', 'Day'))
                     
+                    data, mime = convert_df(schedule_df)
                     st.download_button(
                         label="Download Schedule",
-                        data=convert_df(schedule_df),
+                        data=data,
                         file_name='intelligent_university_schedule.xlsx',
-                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                        mime=mime
                     )
                 else:
                     st.error("Unable to generate schedule. Please check input data.")
@@ -323,6 +277,9 @@ def main():
             st.error(f"An error occurred: {e}")
             logger.error(f"Scheduling Error: {e}")
 
+    with st.expander("Startup timing"):
+        st.dataframe(pd.DataFrame(startup_report(RUN_STARTED)))
+
 if __name__ == "__main__":
     main()
 
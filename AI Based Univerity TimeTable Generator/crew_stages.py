@@ -0,0 +1,38 @@
+import time
+
+from lazy_imports import timed_import
+from timetable_cache import TimetableCache
+
+
+class StageRunner:
+    """Runs a CrewAI pipeline one single-task crew at a time.
+
+    Each stage hands a typed pydantic payload to the next (`output_pydantic`)
+    and is cached in the timetable cache under a key the caller derives from
+    the stage's input, so unchanged stages are skipped on a rerun. `report`
+    holds one row per stage with its seconds, token usage and cache hit.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or TimetableCache()
+        self.report = []
+
+    def run(self, name, cache_key, agent, task, output_model):
+        """Run one single-task crew, or reuse its cached payload when the stage input is unchanged"""
+        started = time.perf_counter()
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.report.append({'stage': name, 'cached': True, 'seconds': time.perf_counter() - started,
+                                'prompt_tokens': 0, 'completion_tokens': 0})
+            return output_model.model_validate(cached)
+
+        crewai = timed_import('crewai')
+        result = crewai.Crew(agents=[agent], tasks=[task], process=crewai.Process.sequential).kickoff()
+        payload = result.pydantic or output_model.model_validate_json(
+            result.raw[result.raw.find('{'):result.raw.rfind('}') + 1]
+        )
+        self.cache.put(cache_key, payload.model_dump(mode='json'))
+        usage = result.token_usage
+        self.report.append({'stage': name, 'cached': False, 'seconds': time.perf_counter() - started,
+                            'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens})
+        return payload
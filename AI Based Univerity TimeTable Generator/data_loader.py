@@ -1,23 +1,23 @@
 import streamlit as st
-import pandas as pd
+from ingestion import load_sheet
 
 def load_data():
     st.title("AI-Powered Timetable Generator")
 
-    uploaded_teacher_file = st.file_uploader("Upload Teacher Allocation Excel file", type=["xlsx", "xls"])
+    uploaded_teacher_file = st.file_uploader("Upload Teacher Allocation file (Excel, CSV or Parquet)", type=["xlsx", "xls", "csv", "parquet"])
     if uploaded_teacher_file:
         try:
-            teacher_df = pd.read_excel(uploaded_teacher_file)
+            teacher_df = load_sheet(uploaded_teacher_file, file_type='Teacher')
             st.success("Teacher data loaded successfully.")
             st.dataframe(teacher_df)
         except Exception as e:
             st.error(f"Error loading teacher file: {e}")
             return None, None
 
-    uploaded_room_file = st.file_uploader("Upload Room Availability Excel file", type=["xlsx", "xls"])
+    uploaded_room_file = st.file_uploader("Upload Room Availability file (Excel, CSV or Parquet)", type=["xlsx", "xls", "csv", "parquet"])
     if uploaded_room_file:
         try:
-            room_df = pd.read_excel(uploaded_room_file)
+            room_df = load_sheet(uploaded_room_file, file_type='Room')
             st.success("Room data loaded successfully.")
             st.dataframe(room_df)
         except Exception as e:
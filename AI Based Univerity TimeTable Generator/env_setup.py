@@ -1,13 +1,15 @@
 # --- Section 1: Environment Setup (env_setup.py) ---
 import streamlit as st
 import pandas as pd
-from crewai import Agent, Task, Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
 import io
 import json
+from lazy_imports import warm_up
 
 load_dotenv()
 
-os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
+
+# CrewAI and LangChain load in the background (once per process) instead of before the page renders
+warm_up(('crewai', 'langchain_google_genai'))
\ No newline at end of file
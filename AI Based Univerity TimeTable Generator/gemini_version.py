@@ -1,11 +1,9 @@
 import os
-import json
-import random
 import logging
-import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from ingestion import load_sheet
+from timetable_export import export_timetable
 
 # Load environment variables
 load_dotenv()
@@ -20,16 +18,6 @@ logger = logging.getLogger(__name__)
 # Configuration class
 class Settings:
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
-    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    BASE_TIME_SLOTS = [
-        {"start": "08:00", "end": "09:15"},
-        {"start": "09:30", "end": "10:45"},
-        {"start": "11:00", "end": "12:15"},
-        {"start": "12:30", "end": "13:45"},
-        {"start": "14:00", "end": "15:15"},
-        {"start": "15:30", "end": "16:45"},
-        {"start": "17:00", "end": "18:15"}
-    ]
 
 # AI and Data Handling Utilities
 class GeminiHandler:
@@ -87,95 +75,18 @@ class UniversitySchedulerCrew:
 
         # Implement your analysis and scheduling logic here...
 
-# Scheduling Logic class (unchanged)
-class SchedulingAgent:
-    def __init__(self, rooms_df, teachers_df):
-        self.rooms_df = rooms_df
-        self.teachers_df = teachers_df
-        self.room_occupancy = {}
-        self.teacher_occupancy = {}
-        self.initialize_occupancy_tracking()
-
-    def initialize_occupancy_tracking(self):
-        for day in Settings.DAYS:
-            self.room_occupancy[day] = {slot['start']: [] for slot in Settings.BASE_TIME_SLOTS}
-            self.teacher_occupancy[day] = {slot['start']: [] for slot in Settings.BASE_TIME_SLOTS}
-
-    def schedule_courses(self, courses):
-        scheduled_courses = []
-        for course in courses:
-            scheduled_course = self.schedule_course(course)
-            if scheduled_course:
-                scheduled_courses.append(scheduled_course)
-        return scheduled_courses
-
-    def schedule_course(self, course):
-        possible_rooms = self._get_suitable_rooms(course['course_type'])
-        
-        for _ in range(course.get('weekly_frequency', 2)):
-            scheduled = False
-            attempts = 0
-            
-            while not scheduled and attempts < 20:
-                day = random.choice(Settings.DAYS)
-                time_slot = random.choice(Settings.BASE_TIME_SLOTS)
-                room = random.choice(possible_rooms)
-                teacher = random.choice(course['teachers'])
-
-                if self._is_slot_available(day, time_slot, room, teacher):
-                    # Mark occupancy...
-                    self.room_occupancy[day][time_slot['start']].append(room)
-                    self.teacher_occupancy[day][time_slot['start']].append(teacher)
-
-                    # Get full teacher details
-                    teacher_details = self.teachers_df[self.teachers_df['Name'] == teacher].iloc[0]
-                    return {
-                        **course,
-                        'assigned_teacher': teacher,
-                        'teacher_department': teacher_details['Department'] if 'Department' in self.teachers_df.columns else 'N/A',
-                        'assigned_room': room,
-                        'assigned_day': day,
-                        'assigned_time_slot': time_slot
-                    }
-                attempts += 1
-        
-        return None
-
-    def _is_slot_available(self, day: str, time_slot: dict, room: str, teacher: str) -> bool:
-        # Check room availability
-        if room in self.room_occupancy[day][time_slot['start']]:
-            return False
-        
-        # Check teacher availability
-        if teacher in self.teacher_occupancy[day][time_slot['start']]:
-            return False
-        
-        return True
-
-    def _get_suitable_rooms(self, course_type: str) -> List[str]:
-        room_type_mapping = {
-            'Theory': 'Lecture Hall',
-            'Hardware Lab': 'Hardware Lab',
-            'Computing Lab': 'Computing Lab',
-            'Physics Lab': 'Physics Lab'
-        }
-        
-        return self.rooms_df[
-            self.rooms_df['Room Type'] == room_type_mapping.get(course_type, 'Lecture Hall')
-        ]['Room Name'].tolist()
-
 # Streamlit Application 
 def main():
     st.title("🎓 CrewAI Intelligent University Scheduler")
     
     # File uploaders for teachers and rooms data
-    teachers_file = st.file_uploader("Upload Teachers Excel (with columns: Teacher, Course, Type)", type=['xlsx'])
-    rooms_file = st.file_uploader("Upload Rooms Excel (with columns: Room Name, Room Type)", type=['xlsx'])
+    teachers_file = st.file_uploader("Upload Teachers Excel, CSV or Parquet (with columns: Teacher, Course, Type)", type=['xlsx', 'csv', 'parquet'])
+    rooms_file = st.file_uploader("Upload Rooms Excel, CSV or Parquet (with columns: Room Name, Room Type)", type=['xlsx', 'csv', 'parquet'])
 
     if teachers_file and rooms_file:
         try:
-            teachers_df = pd.read_excel(teachers_file)
-            rooms_df = pd.read_excel(rooms_file)
+            teachers_df = load_sheet(teachers_file, ['Name', 'Course', 'Course Code', 'Course Type'], 'Teachers')
+            rooms_df = load_sheet(rooms_file, ['Room Name', 'Room Type'], 'Rooms')
 
             if 'Department' not in teachers_df.columns:
                 teachers_df['Department'] = 'General'
@@ -195,11 +106,12 @@ def main():
                     st.dataframe(timetable_df)
 
                     # Download timetable as Excel
+                    data, mime = export_timetable(timetable_df)
                     st.download_button(
                         label="Download Timetable",
-                        data=timetable_df.to_excel(index=False, engine="openpyxl"),
+                        data=data,
                         file_name="timetable.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        mime=mime
                     )
                 else:
                     st.error("Unable to generate timetable. Please check input data.")
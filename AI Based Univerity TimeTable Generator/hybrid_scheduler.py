@@ -0,0 +1,137 @@
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from ingestion import with_course_groups
+from occupancy import OccupancyIndex
+from prompt_encoding import estimate_tokens
+from resource_tables import ROOM_TYPE_MAPPING, ResourceTables
+from solver import ConstraintSolver, is_lab
+
+logger = logging.getLogger(__name__)
+
+COURSE_METADATA_PROMPT = """You are helping plan a university timetable.
+For each course below, infer its scheduling metadata.
+
+Rules:
+- CourseType is one of: Theory, Hardware Lab, Computing Lab, Physics Lab
+- 3 credit theory courses meet 2 times per week; labs meet once per week
+- ClassSize is the expected number of students (integer)
+
+COURSES (code | name | listed type | department):
+{courses}
+
+Return ONLY a JSON array, one object per course, in this exact format:
+[{{"CourseCode": "CS101", "CourseType": "Theory", "WeeklyFrequency": 2, "ClassSize": 40}}]"""
+
+
+def _positive_int(value, default: int) -> int:
+    """The LLM's value when it is a positive integer (or its digits), otherwise the default"""
+    if isinstance(value, bool):
+        return default
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        return default
+    return number if number > 0 else default
+
+
+class HybridTimetableBuilder:
+    """Uses the LLM only for course metadata and places sessions locally.
+
+    The LLM sees small batches of distinct courses and returns a few fields
+    per course, so its output stays tiny no matter how large the faculty is.
+    Placement is done by ConstraintSolver, which is clash-free by
+    construction.
+    """
+
+    def __init__(self, llm_call: Callable[[str], str], days: List[str], time_slots: List[Dict],
+                 blocked_slots=(), day_gap: int = 1, seed: Optional[int] = None):
+        self.llm_call = llm_call
+        self.days = days
+        self.time_slots = time_slots
+        self.blocked_slots = blocked_slots
+        self.day_gap = day_gap
+        self.seed = seed
+        self.stats = {'llm_calls': 0, 'prompt_tokens': 0, 'response_tokens': 0}
+
+    def distinct_courses(self, teachers_df: pd.DataFrame) -> pd.DataFrame:
+        """One row per course code with every teacher who can teach it"""
+        return teachers_df.groupby('Course Code', sort=False).agg(
+            Course=('Course', 'first'),
+            CourseType=('Course Type', 'first'),
+            Department=('Department', 'first'),
+            Teachers=('Name', lambda names: list(dict.fromkeys(names))),
+        ).reset_index().rename(columns={'Course Code': 'CourseCode'})
+
+    def _ask(self, batch: pd.DataFrame) -> Dict[str, Dict]:
+        lines = (
+            batch['CourseCode'].astype(str) + ' | ' + batch['Course'].astype(str) + ' | '
+            + batch['CourseType'].astype(str) + ' | ' + batch['Department'].astype(str)
+        )
+        prompt = COURSE_METADATA_PROMPT.format(courses="\n".join(lines))
+        self.stats['llm_calls'] += 1
+        self.stats['prompt_tokens'] += estimate_tokens(prompt)
+        try:
+            response = self.llm_call(prompt)
+            self.stats['response_tokens'] += estimate_tokens(response)
+            data = json.loads(response[response.find('['):response.rfind(']') + 1])
+            return {str(item['CourseCode']): item for item in data if isinstance(item, dict) and 'CourseCode' in item}
+        except Exception as e:
+            logger.warning(f"Course metadata batch failed, falling back to sheet values: {e}")
+            return {}
+
+    def infer_courses(self, teachers_df: pd.DataFrame, batch_size: int = 25) -> List[Dict]:
+        """Course dicts in the shape SchedulingAgent/ConstraintSolver take"""
+        courses_df = self.distinct_courses(teachers_df)
+        courses = []
+        for begin in range(0, len(courses_df), batch_size):
+            batch = courses_df.iloc[begin:begin + batch_size]
+            inferred = self._ask(batch)
+            for row in batch.itertuples(index=False):
+                meta = inferred.get(str(row.CourseCode), {})
+                # Each field falls back to the sheet or default on its own when the LLM's value is unusable
+                course_type = meta.get('CourseType')
+                if not (isinstance(course_type, str) and course_type in ROOM_TYPE_MAPPING):
+                    course_type = row.CourseType
+                course = {
+                    'name': row.Course,
+                    'code': row.CourseCode,
+                    'course_type': course_type,
+                    'teachers': row.Teachers,
+                    'class_size': _positive_int(meta.get('ClassSize'), 0),
+                }
+                course['weekly_frequency'] = _positive_int(meta.get('WeeklyFrequency'), 1 if is_lab(course) else 2)
+                courses.append(course)
+        return with_course_groups(courses, teachers_df)
+
+    def place(self, courses: List[Dict], rooms_df: pd.DataFrame, teachers_df: pd.DataFrame):
+        """Return (timetable DataFrame in the LLM entry format, solver infeasibility cores)"""
+        tables = ResourceTables(rooms_df, teachers_df)
+        occupancy = OccupancyIndex(self.days, self.time_slots, tables.room_names, tables.teacher_names)
+        for day, slot_start in self.blocked_slots:
+            occupancy.block(day, slot_start)
+        result = ConstraintSolver(
+            occupancy, tables.suitable_rooms, seed=self.seed, day_gap=self.day_gap
+        ).solve(courses)
+
+        timetable_df = pd.DataFrame([
+            {
+                'Day': p['day'],
+                'StartTime': p['time_slot']['start'],
+                'EndTime': p['time_slot']['end'],
+                'CourseCode': p['course']['code'],
+                'Course': p['course']['name'],
+                'CourseType': p['course']['course_type'],
+                'Room': p['room'],
+                'Teacher': p['teacher'],
+            }
+            for p in result.placements
+        ], columns=['Day', 'StartTime', 'EndTime', 'CourseCode', 'Course', 'CourseType', 'Room', 'Teacher'])
+        return timetable_df, result.infeasible
+
+    def build(self, teachers_df: pd.DataFrame, rooms_df: pd.DataFrame, batch_size: int = 25):
+        courses = self.infer_courses(teachers_df, batch_size)
+        return self.place(courses, rooms_df, teachers_df)
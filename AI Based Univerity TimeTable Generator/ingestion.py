@@ -0,0 +1,143 @@
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TEACHER_COLUMNS = ['Name', 'Course', 'Course Code', 'Course Type', 'Department']
+ROOM_COLUMNS = ['Room Name', 'Room Type', 'Capacity']
+CATEGORICAL_COLUMNS = ('Course Type', 'Room Type', 'Department')
+NUMERIC_COLUMNS = ('Capacity',)
+# Optional teachers-sheet columns that group courses for the core/elective clash soft constraint
+SEMESTER_COLUMN = 'Semester'
+ELECTIVE_COLUMN = 'Elective'
+ELECTIVE_VALUES = ('yes', 'y', 'true', '1', 'elective')
+
+
+def read_upload(data: bytes, filename: str) -> pd.DataFrame:
+    """Parse raw upload bytes as Excel, CSV or Parquet based on the file extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(io.BytesIO(data), engine='pyarrow')
+    if extension == '.parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data))
+
+
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """Trim header/cell whitespace and store the low-cardinality columns as categoricals"""
+    df = df.rename(columns=lambda column: str(column).strip())
+    for column in df.select_dtypes(include=['object', 'string']).columns:
+        stripped = df[column].str.strip()
+        # .str returns NaN for non-string cells (e.g. numeric course codes); keep those as they were
+        df[column] = stripped.where(stripped.notna(), df[column])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+
+def validate_schema(df: pd.DataFrame, required_columns: Iterable[str], file_type: str):
+    """Raise ValueError listing every missing column, empty column and non-numeric cell at once"""
+    required_columns = list(required_columns)
+    problems: List[str] = []
+    missing = [column for column in required_columns if column not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+
+    present = df[[column for column in required_columns if column in df.columns]]
+    empty_counts = present.isna().sum()
+    numeric = [column for column in NUMERIC_COLUMNS if column in present.columns]
+    # NaN in a numeric column after coercion means the cell held text
+    empty = empty_counts[empty_counts > 0].drop(numeric, errors='ignore')
+    if len(empty):
+        problems.append("empty values in columns: " + ", ".join(f"{c} ({n} rows)" for c, n in empty.items()))
+    bad_numbers = empty_counts[numeric][empty_counts[numeric] > 0]
+    if len(bad_numbers):
+        problems.append("missing or non-numeric values in: " + ", ".join(f"{c} ({n} rows)" for c, n in bad_numbers.items()))
+
+    if problems:
+        raise ValueError(f"{file_type} file has " + "; ".join(problems))
+
+
+def course_groups(teachers_df: pd.DataFrame) -> Dict[str, Dict]:
+    """{course code: {'semester', 'elective'}} from the optional Semester/Elective columns"""
+    columns = [c for c in (SEMESTER_COLUMN, ELECTIVE_COLUMN) if c in teachers_df.columns]
+    if not columns:
+        return {}
+    first = teachers_df.groupby('Course Code', sort=False, observed=True)[columns].first()
+    groups = {}
+    for code, row in first.iterrows():
+        semester = row.get(SEMESTER_COLUMN)
+        elective = row.get(ELECTIVE_COLUMN)
+        groups[str(code)] = {
+            'semester': None if pd.isna(semester) else str(semester),
+            'elective': not pd.isna(elective) and str(elective).strip().lower() in ELECTIVE_VALUES,
+        }
+    return groups
+
+
+def with_course_groups(courses: List[Dict], teachers_df: pd.DataFrame) -> List[Dict]:
+    """Copy semester/elective from the sheet onto course dicts, matched by course code"""
+    groups = course_groups(teachers_df)
+    return [{**course, **groups.get(str(course.get('code')), {})} for course in courses]
+
+
+class SheetStore:
+    """Parses each distinct upload once and keeps it in typed columnar form.
+
+    Uploads are keyed by a hash of their bytes. A parsed sheet is kept in a
+    small in-process LRU (so Streamlit reruns never re-parse) and written to
+    `directory` as Parquet, so a later session loading the same file skips
+    the slow openpyxl parse entirely.
+    """
+
+    def __init__(self, directory: str = '.ingest_cache', max_in_memory: int = 16):
+        self.directory = directory
+        self.max_in_memory = max_in_memory
+        self.memory: OrderedDict = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, uploaded_file) -> pd.DataFrame:
+        data = uploaded_file.getvalue() if hasattr(uploaded_file, 'getvalue') else uploaded_file.read()
+        key = hashlib.sha256(data).hexdigest()
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key].copy()
+
+        path = os.path.join(self.directory, f"{key}.parquet")
+        if os.path.exists(path):
+            df = pd.read_parquet(path)
+        else:
+            df = to_columnar(read_upload(data, getattr(uploaded_file, 'name', '')))
+            try:
+                df.to_parquet(path, index=False)
+            except Exception as e:
+                # Mixed-type object columns cannot be written; the sheet still works from memory
+                logger.warning(f"Could not cache parsed sheet as Parquet: {e}")
+
+        self.memory[key] = df
+        if len(self.memory) > self.max_in_memory:
+            self.memory.popitem(last=False)
+        return df.copy()
+
+
+_default_store = None
+
+
+def load_sheet(uploaded_file, required_columns: Iterable[str] = (), file_type: str = 'Input') -> pd.DataFrame:
+    """Load an uploaded sheet through the process-wide SheetStore and validate its schema"""
+    global _default_store
+    if _default_store is None:
+        _default_store = SheetStore()
+    df = _default_store.load(uploaded_file)
+    validate_schema(df, required_columns, file_type)
+    return df
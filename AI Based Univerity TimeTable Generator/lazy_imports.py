@@ -0,0 +1,45 @@
+import importlib
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List
+
+# Seconds each heavy module took to import in this process, for the startup report
+IMPORT_SECONDS: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def timed_import(name: str):
+    """Import a module on first use and record how long the first import took"""
+    # Always go through import_module: while the warm-up thread is still importing, sys.modules
+    # already holds the half-initialized module and import_module waits for it to finish
+    fresh = name not in sys.modules
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    if fresh:
+        with _lock:
+            IMPORT_SECONDS.setdefault(name, time.perf_counter() - started)
+    return module
+
+
+def warm_up(names: Iterable[str]) -> threading.Thread:
+    """Import `names` on a daemon thread so the SDKs are loaded by the time the user clicks"""
+    def run():
+        for name in names:
+            try:
+                timed_import(name)
+            except Exception:
+                # The foreground import will raise the real error when the module is needed
+                pass
+
+    thread = threading.Thread(target=run, name='sdk-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def startup_report(run_started: float) -> List[Dict]:
+    """Import timings so far plus the time this script run has taken up to now"""
+    with _lock:
+        rows = [{'step': f"import {name}", 'seconds': round(seconds, 3)} for name, seconds in IMPORT_SECONDS.items()]
+    rows.append({'step': 'script run so far', 'seconds': round(time.perf_counter() - run_started, 3)})
+    return rows
@@ -1,9 +1,14 @@
+import time
+RUN_STARTED = time.perf_counter()
+
 from env_setup import *
 from data_loader import load_data
 from agent_setup import create_agents_and_tasks
 import streamlit as st
 import pandas as pd
-import io
+from timetable_export import export_timetable
+from timetable_formatter import schedule_to_timetable
+from lazy_imports import startup_report
 
 def main():
     teacher_df, room_df = load_data()
@@ -11,30 +16,32 @@ def main():
     if teacher_df is not None and room_df is not None:
         crew = create_agents_and_tasks(teacher_df, room_df)
         try:
-             # Start the crew to get the final output
-             result = crew.kickoff()
-             # Parse the JSON timetable string back into a dataframe
+             # Run the stages; unchanged ones are served from the cache
+             plan = crew.kickoff()
+             st.write("### Crew Stages")
+             st.dataframe(pd.DataFrame(crew.stages.report))
+             # Build the table from the conflict-resolver's typed plan locally instead of asking an agent to format it
              try:
-                 timetable_df = pd.read_excel(io.BytesIO(result.encode()))
+                 timetable_df = schedule_to_timetable([course.model_dump(mode='json') for course in plan.scheduled_courses])
              except Exception as e:
                 st.error(f"Could not parse the timetable into data frame, due to the following error: {e}")
                 return
 
              st.subheader("Generated Timetable")
              st.dataframe(timetable_df)
-             excel_buffer = io.BytesIO()
-             with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-                timetable_df.to_excel(writer, sheet_name='Timetable', index=False)
-             excel_buffer.seek(0)
+             excel_data, mime = export_timetable(timetable_df)
              st.download_button(
                 label="Download Excel Timetable",
-                data=excel_buffer,
+                data=excel_data,
                 file_name="timetable.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                mime=mime
             )
         except Exception as e:
              st.error(f"An error occurred during timetable generation: {e}")
 
+    with st.expander("Startup timing"):
+        st.dataframe(pd.DataFrame(startup_report(RUN_STARTED)))
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+from occupancy import OccupancyIndex
+from optimizer import LocalSearchOptimizer
+from solver import ConstraintSolver
+
+# Read-only tables, installed once per worker process by the pool initializer
+# so individual tasks only carry their seed.
+_tables: Dict = {}
+
+
+def _init_worker(tables: Dict):
+    _tables.clear()
+    _tables.update(tables)
+
+
+def build_occupancy(tables: Dict) -> OccupancyIndex:
+    occupancy = OccupancyIndex(tables['days'], tables['time_slots'], tables['rooms'], tables['teachers'])
+    for day, slot_start in tables.get('blocked_slots', []):
+        occupancy.block(day, slot_start)
+    return occupancy
+
+
+def solve_once(seed: int, tables: Optional[Dict] = None) -> Dict:
+    """One seeded solve (plus optional local search) scored on unplaced sessions, then soft cost"""
+    tables = tables or _tables
+    started = time.perf_counter()
+    occupancy = build_occupancy(tables)
+    suitable_rooms = lambda course_type, class_size=0: tables['suitable_rooms'].get((course_type, class_size), ())
+
+    result = ConstraintSolver(
+        occupancy, suitable_rooms, seed=seed, day_gap=tables.get('day_gap', 1)
+    ).solve(tables['courses'])
+    schedule = [
+        {
+            **p['course'],
+            'assigned_teacher': p['teacher'],
+            'assigned_room': p['room'],
+            'assigned_day': p['day'],
+            'assigned_time_slot': p['time_slot'],
+        }
+        for p in result.placements
+    ]
+    optimizer = LocalSearchOptimizer(
+        occupancy,
+        suitable_rooms,
+        weights=tables.get('weights'),
+        max_daily_classes=tables.get('max_daily_classes', 3),
+        day_gap=tables.get('day_gap', 1),
+        seed=seed
+    )
+    # A zero budget still returns the cost report, so every run is scored the same way
+    schedule, report = optimizer.optimize(schedule, tables.get('time_budget', 0.0))
+
+    return {
+        'seed': seed,
+        'schedule': schedule,
+        'infeasible': result.infeasible,
+        'placed': len(schedule),
+        'unplaced': len(result.infeasible),
+        'soft_cost': report['final']['total'],
+        'backtracks': result.backtracks,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_multistart(tables: Dict, seeds: Sequence[int], max_workers: Optional[int] = None):
+    """Run one seeded solve per seed across a process pool.
+
+    Returns (best run, per-run statistics). The best run places the most
+    sessions and, among those, has the lowest soft cost.
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, len(seeds))
+    if max_workers <= 1:
+        runs = [solve_once(seed, tables) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(tables,)) as pool:
+            runs = list(pool.map(solve_once, seeds))
+
+    best = min(runs, key=lambda run: (run['unplaced'], run['soft_cost']))
+    stats = [{key: value for key, value in run.items() if key not in ('schedule', 'infeasible')} for run in runs]
+    return best, stats
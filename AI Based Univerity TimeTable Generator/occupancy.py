@@ -0,0 +1,153 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def span_starts(mask: np.ndarray, length: int) -> np.ndarray:
+    """True at [day, slot, ...] where mask holds for `length` consecutive slots starting there.
+
+    The slot axis is axis 1; starts whose span would run past the last slot are False.
+    """
+    out = np.zeros_like(mask, dtype=bool)
+    n = mask.shape[1] - length + 1
+    if n <= 0:
+        return out
+    window = mask[:, :n].copy()
+    for k in range(1, length):
+        window &= mask[:, k:k + n]
+    out[:, :n] = window
+    return out
+
+
+class OccupancyIndex:
+    """Day x slot x resource occupancy cubes for rooms and teachers.
+
+    Every availability test is a handful of array lookups, multi-slot spans
+    are checked and reserved as one slice, and bulk queries ("all free
+    (day, slot, room) for this teacher") are answered with a single
+    vectorized mask instead of scanning per-slot lists.
+    """
+
+    def __init__(self, days: List[str], time_slots: List[Dict], rooms: Iterable[str], teachers: Iterable[str] = ()):
+        self.days = list(days)
+        self.time_slots = list(time_slots)
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+        self.slot_index = {slot['start']: i for i, slot in enumerate(self.time_slots)}
+
+        self.room_names = list(dict.fromkeys(rooms))
+        self.room_index = {name: i for i, name in enumerate(self.room_names)}
+        self.teacher_names = list(dict.fromkeys(teachers))
+        self.teacher_index = {name: i for i, name in enumerate(self.teacher_names)}
+
+        shape = (len(self.days), len(self.time_slots))
+        self.blocked = np.zeros(shape, dtype=bool)
+        self.rooms = np.zeros(shape + (len(self.room_names),), dtype=bool)
+        self.teachers = np.zeros(shape + (max(len(self.teacher_names), 1),), dtype=bool)
+
+    def room_id(self, room: str) -> int:
+        return self.room_index[room]
+
+    def teacher_id(self, teacher: str) -> int:
+        """Return the teacher's column, registering unknown names on first use"""
+        idx = self.teacher_index.get(teacher)
+        if idx is None:
+            idx = len(self.teacher_names)
+            self.teacher_names.append(teacher)
+            self.teacher_index[teacher] = idx
+            if idx >= self.teachers.shape[2]:
+                # Grow geometrically so repeated registrations stay amortized O(1)
+                grown = np.zeros(self.teachers.shape[:2] + (self.teachers.shape[2] * 2,), dtype=bool)
+                grown[:, :, :self.teachers.shape[2]] = self.teachers
+                self.teachers = grown
+        return idx
+
+    def block(self, day: str, slot_start: str):
+        """Close a (day, slot) cell to every room and teacher, e.g. the Friday 12:30 break"""
+        self.blocked[self.day_index[day], self.slot_index[slot_start]] = True
+
+    def close_room(self, room: str):
+        """Take a room out of service for the whole week"""
+        self.rooms[:, :, self.room_index[room]] = True
+
+    def block_teacher(self, teacher: str, day: str, slot_start: Optional[str] = None):
+        """Mark a teacher unavailable for one slot, or the whole day when no slot is given"""
+        t = self.teacher_id(teacher)
+        if slot_start is None:
+            self.teachers[self.day_index[day], :, t] = True
+        else:
+            self.teachers[self.day_index[day], self.slot_index[slot_start], t] = True
+
+    def span_time_slot(self, slot_start: str, length: int = 1) -> Dict:
+        """The {'start', 'end'} time slot covered by `length` slots beginning at `slot_start`"""
+        s = self.slot_index[slot_start]
+        return {"start": slot_start, "end": self.time_slots[s + length - 1]['end']}
+
+    def _span(self, day: str, slot_start: str, length: int) -> Optional[Tuple[int, slice]]:
+        s = self.slot_index[slot_start]
+        if s + length > len(self.time_slots):
+            return None
+        return self.day_index[day], slice(s, s + length)
+
+    def is_room_free(self, day: str, slot_start: str, room: str, length: int = 1) -> bool:
+        position = self._span(day, slot_start, length)
+        if position is None:
+            return False
+        d, span = position
+        return not (self.blocked[d, span].any() or self.rooms[d, span, self.room_index[room]].any())
+
+    def is_teacher_free(self, day: str, slot_start: str, teacher: str, length: int = 1) -> bool:
+        position = self._span(day, slot_start, length)
+        if position is None:
+            return False
+        d, span = position
+        t = self.teacher_id(teacher)
+        return not (self.blocked[d, span].any() or self.teachers[d, span, t].any())
+
+    def is_available(self, day: str, slot_start: str, room: str, teacher: str, length: int = 1) -> bool:
+        position = self._span(day, slot_start, length)
+        if position is None:
+            return False
+        d, span = position
+        t = self.teacher_id(teacher)
+        return not (
+            self.blocked[d, span].any()
+            or self.rooms[d, span, self.room_index[room]].any()
+            or self.teachers[d, span, t].any()
+        )
+
+    def reserve(self, day: str, slot_start: str, room: str, teacher: str, length: int = 1):
+        d, span = self._span(day, slot_start, length)
+        t = self.teacher_id(teacher)
+        self.rooms[d, span, self.room_index[room]] = True
+        self.teachers[d, span, t] = True
+
+    def release(self, day: str, slot_start: str, room: str, teacher: str, length: int = 1):
+        d, span = self._span(day, slot_start, length)
+        t = self.teacher_id(teacher)
+        self.rooms[d, span, self.room_index[room]] = False
+        self.teachers[d, span, t] = False
+
+    def free_rooms(self, room_ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Boolean (day, slot, room) mask of free, unblocked rooms, optionally restricted to `room_ids`"""
+        rooms = self.rooms if room_ids is None else self.rooms[:, :, room_ids]
+        return ~rooms & ~self.blocked[:, :, None]
+
+    def free_room_mask(self, rooms: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Same as free_rooms, keyed by room names"""
+        if rooms is None:
+            return self.free_rooms()
+        return self.free_rooms([self.room_index[r] for r in rooms])
+
+    def free_teacher_mask(self, teacher: str) -> np.ndarray:
+        """Boolean (day, slot) mask of cells where the teacher is free"""
+        t = self.teacher_id(teacher)
+        return ~self.teachers[:, :, t] & ~self.blocked
+
+    def free_slots_for_teacher(self, teacher: str, rooms: Optional[Iterable[str]] = None,
+                               length: int = 1) -> List[Tuple[str, str, str]]:
+        """All (day, slot start, room) triples where the teacher and room are free for `length` slots"""
+        room_names = self.room_names if rooms is None else list(rooms)
+        mask = self.free_room_mask(room_names) & self.free_teacher_mask(teacher)[:, :, None]
+        return [
+            (self.days[d], self.time_slots[s]['start'], room_names[r])
+            for d, s, r in np.argwhere(span_starts(mask, length))
+        ]
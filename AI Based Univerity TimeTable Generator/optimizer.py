@@ -0,0 +1,232 @@
+import math
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from occupancy import OccupancyIndex
+from solver import class_size, slot_span
+
+DEFAULT_WEIGHTS = {
+    'teacher_overload': 10.0,   # each class beyond the daily maximum for a teacher
+    'back_to_back': 1.0,        # consecutive slots for a teacher (only the 15 minute break between)
+    'core_clash': 20.0,         # two core courses of one semester at the same time
+    'elective_clash': 2.0,      # an elective overlapping another course of its semester
+}
+
+
+class SoftCostModel:
+    """Incrementally maintained soft-constraint cost of a timetable.
+
+    Sessions are added and removed one at a time; each call only re-scores
+    the teacher-day and semester-slot cells the session touches, so a move
+    costs O(session length) regardless of timetable size.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_daily_classes: int = 3):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.max_daily_classes = max_daily_classes
+        self.counts = {name: 0 for name in self.weights}
+        self.teacher_days = {}
+        self.semester_cells = {}
+
+    @property
+    def total(self) -> float:
+        return sum(self.weights[name] * count for name, count in self.counts.items())
+
+    def breakdown(self) -> Dict:
+        report = {name: {'count': count, 'cost': self.weights[name] * count} for name, count in self.counts.items()}
+        report['total'] = self.total
+        return report
+
+    def _teacher_day_counts(self, spans: List[tuple]):
+        ordered = sorted(spans)
+        overload = max(0, len(ordered) - self.max_daily_classes)
+        back_to_back = sum(1 for (s1, l1), (s2, _) in zip(ordered, ordered[1:]) if s2 == s1 + l1)
+        return overload, back_to_back
+
+    @staticmethod
+    def _cell_counts(core: int, elective: int):
+        return core * (core - 1) // 2, elective * (elective - 1) // 2 + core * elective
+
+    def _update(self, session: Dict, sign: int):
+        key = (session['teacher'], session['day'])
+        spans = self.teacher_days.setdefault(key, [])
+        overload, back_to_back = self._teacher_day_counts(spans)
+        if sign > 0:
+            spans.append((session['start'], session['length']))
+        else:
+            spans.remove((session['start'], session['length']))
+        new_overload, new_back_to_back = self._teacher_day_counts(spans)
+        self.counts['teacher_overload'] += new_overload - overload
+        self.counts['back_to_back'] += new_back_to_back - back_to_back
+
+        if session['semester'] is None:
+            return
+        for u in range(session['start'], session['start'] + session['length']):
+            cell = self.semester_cells.setdefault((session['semester'], session['day'], u), [0, 0])
+            core_clash, elective_clash = self._cell_counts(*cell)
+            cell[1 if session['elective'] else 0] += sign
+            new_core_clash, new_elective_clash = self._cell_counts(*cell)
+            self.counts['core_clash'] += new_core_clash - core_clash
+            self.counts['elective_clash'] += new_elective_clash - elective_clash
+
+    def add(self, session: Dict):
+        self._update(session, 1)
+
+    def remove(self, session: Dict):
+        self._update(session, -1)
+
+
+class LocalSearchOptimizer:
+    """Simulated annealing over hard-feasible moves of already placed sessions.
+
+    A move relocates one session to another (day, start, room, teacher) that
+    keeps every hard constraint intact; the soft cost delta comes from
+    SoftCostModel without re-scoring the timetable. The best timetable seen
+    within `time_budget` seconds is returned with a cost report.
+    """
+
+    def __init__(self, occupancy: OccupancyIndex, suitable_rooms: Callable[[str, int], Sequence[str]],
+                 weights: Optional[Dict[str, float]] = None, max_daily_classes: int = 3,
+                 day_gap: int = 1, seed: Optional[int] = None):
+        self.occupancy = occupancy
+        self.suitable_rooms = suitable_rooms
+        self.weights = weights
+        self.max_daily_classes = max_daily_classes
+        self.day_gap = day_gap
+        self.rng = random.Random(seed)
+
+    def _to_sessions(self, schedule: List[Dict]) -> List[Dict]:
+        occ = self.occupancy
+        pools = {}
+        sessions = []
+        for record in schedule:
+            key = (record['course_type'], class_size(record))
+            if key not in pools:
+                pools[key] = np.array([occ.room_id(r) for r in self.suitable_rooms(*key)], dtype=int)
+            sessions.append({
+                'record': record,
+                'course_key': (record.get('code'), record.get('name')),
+                'teacher': occ.teacher_id(record['assigned_teacher']),
+                'teachers': [occ.teacher_id(t) for t in record.get('teachers') or [record['assigned_teacher']]],
+                'day': occ.day_index[record['assigned_day']],
+                'start': occ.slot_index[record['assigned_time_slot']['start']],
+                'length': slot_span(record),
+                'room': occ.room_id(record['assigned_room']),
+                'pool': pools[key],
+                'semester': record.get('semester'),
+                'elective': bool(record.get('elective')),
+            })
+        return sessions
+
+    def _set_cells(self, session: Dict, value: bool):
+        span = slice(session['start'], session['start'] + session['length'])
+        self.occupancy.rooms[session['day'], span, session['room']] = value
+        self.occupancy.teachers[session['day'], span, session['teacher']] = value
+
+    def _propose(self, k: int, sessions: List[Dict], siblings: Dict) -> Optional[Dict]:
+        """A random hard-feasible relocation of session k, assuming its own cells are released"""
+        occ = self.occupancy
+        session = sessions[k]
+        length = session['length']
+        d = self.rng.randrange(len(occ.days))
+        s = self.rng.randrange(len(occ.time_slots) - length + 1)
+        t = self.rng.choice(session['teachers'])
+        span = slice(s, s + length)
+        if occ.blocked[d, span].any() or occ.teachers[d, span, t].any():
+            return None
+        for j in siblings[session['course_key']]:
+            if j != k and sessions[j]['teacher'] == t and abs(sessions[j]['day'] - d) <= self.day_gap:
+                return None
+        free = np.flatnonzero(~occ.rooms[d, span][:, session['pool']].any(axis=0))
+        if not len(free):
+            return None
+        # Pools are ordered smallest room first, so the first free one is the best fit
+        room = int(session['pool'][free[0]])
+        return {**session, 'day': d, 'start': s, 'teacher': t, 'room': room}
+
+    def optimize(self, schedule: List[Dict], time_budget: float = 5.0, movable: Optional[Iterable[int]] = None,
+                 max_iterations: Optional[int] = None):
+        """Return (improved schedule records, report) within `time_budget` seconds.
+
+        `movable` restricts the moves to those positions of `schedule`; every
+        other session stays where it is but still counts towards the cost.
+        """
+        started = time.perf_counter()
+        sessions = self._to_sessions(schedule)
+        candidates = list(range(len(sessions))) if movable is None else sorted(set(movable))
+        model = SoftCostModel(self.weights, self.max_daily_classes)
+        for session in sessions:
+            model.add(session)
+        siblings = {}
+        for k, session in enumerate(sessions):
+            siblings.setdefault(session['course_key'], []).append(k)
+
+        initial = model.breakdown()
+        best_cost = model.total
+        # Moves replace session dicts rather than mutating them, so a shallow copy is a snapshot
+        best = list(sessions)
+        start_temperature = max(model.weights.values())
+        iterations = accepted = 0
+
+        while candidates and best_cost > 0 and (max_iterations is None or iterations < max_iterations):
+            if iterations % 200 == 0:
+                elapsed = time.perf_counter() - started
+                if elapsed >= time_budget:
+                    break
+                temperature = start_temperature * (1 - elapsed / time_budget) + 1e-6
+            iterations += 1
+
+            k = self.rng.choice(candidates)
+            current = sessions[k]
+            self._set_cells(current, False)
+            candidate = self._propose(k, sessions, siblings)
+            if candidate is None:
+                self._set_cells(current, True)
+                continue
+
+            before = model.total
+            model.remove(current)
+            model.add(candidate)
+            delta = model.total - before
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                sessions[k] = candidate
+                self._set_cells(candidate, True)
+                accepted += 1
+                if model.total < best_cost:
+                    best_cost = model.total
+                    best = list(sessions)
+            else:
+                model.remove(candidate)
+                model.add(current)
+                self._set_cells(current, True)
+
+        # Leave the occupancy index describing the best timetable found
+        for session in sessions:
+            self._set_cells(session, False)
+        final_model = SoftCostModel(self.weights, self.max_daily_classes)
+        for session in best:
+            self._set_cells(session, True)
+            final_model.add(session)
+
+        occ = self.occupancy
+        improved = [
+            {
+                **session['record'],
+                'assigned_teacher': occ.teacher_names[session['teacher']],
+                'assigned_room': occ.room_names[session['room']],
+                'assigned_day': occ.days[session['day']],
+                'assigned_time_slot': occ.span_time_slot(occ.time_slots[session['start']]['start'], session['length']),
+            }
+            for session in best
+        ]
+        report = {
+            'initial': initial,
+            'final': final_model.breakdown(),
+            'iterations': iterations,
+            'accepted_moves': accepted,
+            'seconds': time.perf_counter() - started,
+        }
+        return improved, report
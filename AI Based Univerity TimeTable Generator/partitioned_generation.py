@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from occupancy import OccupancyIndex
+from resource_tables import ResourceTables
+
+logger = logging.getLogger(__name__)
+
+
+def partition_teachers(teachers_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Split the teachers sheet by department, and by semester when the sheet has one"""
+    keys = ['Department'] + (['Semester'] if 'Semester' in teachers_df.columns else [])
+    return {
+        " / ".join(str(part) for part in (key if isinstance(key, tuple) else (key,))): group
+        for key, group in teachers_df.groupby(keys, sort=False, observed=True)
+    }
+
+
+def _to_minutes(text: str) -> int:
+    hours, minutes = str(text).split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class ReservationTable:
+    """Global room/teacher reservations shared by all partitions.
+
+    Entries are committed one at a time; an entry that clashes with what is
+    already reserved (from its own or another partition) is not committed
+    and can be moved by `repair` to the first free slot of the same length
+    for the same teacher in a room of the right type.
+    """
+
+    def __init__(self, days: List[str], time_slots: List[Dict], rooms_df: pd.DataFrame,
+                 teachers_df: pd.DataFrame, blocked_slots=()):
+        self.tables = ResourceTables(rooms_df, teachers_df)
+        self.occupancy = OccupancyIndex(days, time_slots, self.tables.room_names, self.tables.teacher_names)
+        for day, slot_start in blocked_slots:
+            self.occupancy.block(day, slot_start)
+        self.slot_bounds = np.array([[_to_minutes(s['start']), _to_minutes(s['end'])] for s in time_slots])
+        self.entries = []
+        self.lock = asyncio.Lock()
+
+    def _cells(self, entry: Dict) -> Optional[np.ndarray]:
+        """Indices of the grid slots the entry's interval overlaps"""
+        start, end = _to_minutes(entry['StartTime']), _to_minutes(entry['EndTime'])
+        slots = np.flatnonzero((self.slot_bounds[:, 0] < end) & (self.slot_bounds[:, 1] > start))
+        return slots if len(slots) else None
+
+    def try_commit(self, entry: Dict) -> bool:
+        occ = self.occupancy
+        slots = self._cells(entry)
+        if slots is None or entry['Day'] not in occ.day_index or entry['Room'] not in occ.room_index:
+            return False
+        d, r, t = occ.day_index[entry['Day']], occ.room_index[entry['Room']], occ.teacher_id(entry['Teacher'])
+        if occ.blocked[d, slots].any() or occ.rooms[d, slots, r].any() or occ.teachers[d, slots, t].any():
+            return False
+        occ.rooms[d, slots, r] = True
+        occ.teachers[d, slots, t] = True
+        self.entries.append(entry)
+        return True
+
+    def repair(self, entry: Dict) -> Optional[Dict]:
+        """Commit the entry at the first free (day, start, room) of the same length, if any"""
+        occ = self.occupancy
+        slots = self._cells(entry)
+        length = len(slots) if slots is not None else 1
+        rooms = self.tables.suitable_rooms(entry.get('CourseType', 'Theory'))
+        for day, start, room in occ.free_slots_for_teacher(entry['Teacher'], rooms, length):
+            time_slot = occ.span_time_slot(start, length)
+            moved = {**entry, 'Day': day, 'StartTime': time_slot['start'], 'EndTime': time_slot['end'], 'Room': room}
+            if self.try_commit(moved):
+                return moved
+        return None
+
+    def summary(self, limit: int = 400) -> str:
+        """Compact text of current reservations for inclusion in a partition prompt"""
+        if not self.entries:
+            return "None"
+        lines = [
+            f"{e['Day']} {e['StartTime']}-{e['EndTime']} room {e['Room']} teacher {e['Teacher']}"
+            for e in self.entries[-limit:]
+        ]
+        return "\n".join(lines)
+
+
+async def generate_partitioned(partitions: Dict[str, pd.DataFrame], reservations: ReservationTable,
+                               generate_partition: Callable[[pd.DataFrame, str], Awaitable[List[Dict]]],
+                               max_concurrency: int = 4):
+    """Generate every partition concurrently and merge into one clash-free entry list.
+
+    `generate_partition(teachers_part, reserved_text)` produces the LLM entries
+    for one partition. At most `max_concurrency` calls are in flight; each
+    prompt sees the reservations committed so far, and each result is merged
+    under the table lock, with clashing entries repaired or dropped.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    report = {'partitions': [], 'repaired': [], 'dropped': []}
+
+    async def run(name: str, part: pd.DataFrame):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                entries = await generate_partition(part, reservations.summary())
+            except Exception as e:
+                logger.error(f"Partition {name} failed: {e}")
+                report['partitions'].append({'partition': name, 'entries': 0, 'error': str(e),
+                                             'seconds': time.perf_counter() - started})
+                return
+        async with reservations.lock:
+            for entry in entries:
+                if reservations.try_commit(entry):
+                    continue
+                moved = reservations.repair(entry)
+                if moved is None:
+                    report['dropped'].append(entry)
+                else:
+                    report['repaired'].append({'before': entry, 'after': moved})
+        report['partitions'].append({'partition': name, 'entries': len(entries), 'error': None,
+                                     'seconds': time.perf_counter() - started})
+
+    await asyncio.gather(*(run(name, part) for name, part in partitions.items()))
+    return pd.DataFrame(reservations.entries), report
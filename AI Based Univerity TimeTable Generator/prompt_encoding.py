@@ -0,0 +1,81 @@
+from typing import Dict, Mapping
+
+import pandas as pd
+
+# Column -> code prefix for values repeated across many rows
+TEACHER_CODES = {'Course Type': 'T', 'Department': 'D'}
+ROOM_CODES = {'Room Type': 'R'}
+# Column -> label of the labelled 'Teacher: ..., Code: ...' lines the prompts used before encode_table
+TEACHER_LABELS = {'Name': 'Teacher', 'Course': 'Course', 'Course Code': 'Code', 'Course Type': 'Type',
+                  'Department': 'Department'}
+ROOM_LABELS = {'Room Name': 'Room', 'Room Type': 'Type', 'Capacity': 'Capacity'}
+
+LEGEND_NOTE = "Codes like T1 or D2 are defined in the legend; always write the full value in your output."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for prompt-size reporting"""
+    return len(text) // 4
+
+
+def _cells(values: pd.Series) -> pd.Series:
+    return values.astype(str).where(values.notna(), '')
+
+
+def encode_table(df: pd.DataFrame, codes: Mapping[str, str] = None) -> str:
+    """Serialize a sheet as a legend, one header line and pipe-separated rows.
+
+    Columns named in `codes` are dictionary-encoded: each distinct value
+    becomes a short code (prefix + number) listed once in the legend, so a
+    department or course type repeated on every row costs a couple of
+    characters instead of its full name. All rows are built with column-wise
+    string operations; nothing is formatted per row in Python.
+    """
+    codes = codes or {}
+    legend, columns = [], []
+    for column in df.columns:
+        values = df[column]
+        if column in codes:
+            categorical = values.astype('category').cat.remove_unused_categories()
+            labels = [f"{codes[column]}{i + 1}" for i in range(len(categorical.cat.categories))]
+            legend.append(f"{column}: " + ", ".join(
+                f"{label}={value}" for label, value in zip(labels, categorical.cat.categories)
+            ))
+            values = categorical.cat.rename_categories(labels).astype(object)
+        columns.append(_cells(values))
+
+    if not columns:
+        return ""
+    rows = columns[0].str.cat(columns[1:], sep=' | ') if len(columns) > 1 else columns[0]
+    lines = []
+    if legend:
+        lines += ["Legend:"] + legend
+    lines.append(" | ".join(str(column) for column in df.columns))
+    lines += rows.tolist()
+    return "\n".join(lines)
+
+
+def labelled_rows(df: pd.DataFrame, labels: Mapping[str, str]) -> str:
+    """The previous prompt format, one 'Label: value, Label: value' line per row, kept as the size baseline"""
+    parts = [label + ': ' + _cells(df[column]) for column, label in labels.items()]
+    if not parts:
+        return ""
+    return "\n".join(parts[0].str.cat(parts[1:], sep=', ').tolist())
+
+
+def encode_teachers(teachers_df: pd.DataFrame) -> str:
+    return encode_table(teachers_df, TEACHER_CODES)
+
+
+def encode_rooms(rooms_df: pd.DataFrame) -> str:
+    return encode_table(rooms_df, ROOM_CODES)
+
+
+def prompt_size(before: str, after: str) -> Dict[str, float]:
+    """Estimated tokens for the old and new serialization and the share saved"""
+    tokens_before, tokens_after = estimate_tokens(before), estimate_tokens(after)
+    return {
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'saved_pct': round(100 * (1 - tokens_after / tokens_before), 1) if tokens_before else 0.0,
+    }
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import asyncio
 import pandas as pd
 import json
 from datetime import datetime
@@ -7,6 +8,15 @@ from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from timetable_validator import validate_timetable
+from hybrid_scheduler import HybridTimetableBuilder
+from streaming_json import StreamingArrayParser
+from partitioned_generation import ReservationTable, generate_partitioned, partition_teachers
+from timetable_cache import TimetableCache
+from ingestion import ROOM_COLUMNS, TEACHER_COLUMNS, load_sheet, validate_schema
+from prompt_encoding import (LEGEND_NOTE, ROOM_LABELS, TEACHER_LABELS, encode_rooms, encode_teachers,
+                             labelled_rows, prompt_size)
+from timetable_export import DEFAULT_VIEWS, export_timetable
 
 # Load environment variables
 load_dotenv()
@@ -48,41 +58,88 @@ Generate a timetable following these constraints:
    - Controlled overlaps for electives
 """
 
+TIMETABLE_PROMPT = PromptTemplate(
+    template="""
+{constraints}
+
+Using this data, generate a complete weekly timetable:
+
+TEACHERS INFORMATION:
+{teachers}
+
+ROOMS INFORMATION:
+{rooms}
+
+{legend_note}
+
+ALREADY RESERVED (these rooms and teachers are taken at these times, do not use them):
+{reserved}
+
+Return ONLY a JSON array where each entry has this exact format:
+{{
+    "Day": "Monday",
+    "StartTime": "08:00",
+    "EndTime": "09:15",
+    "CourseCode": "CS101",
+    "Course": "Programming Fundamentals"
+    "CourseType": "Theory",
+    "Room": "Room Name",
+    "Teacher": "Teacher Name"
+}}
+
+Return only the JSON array with no additional text or explanations.""",
+    input_variables=["constraints", "teachers", "rooms", "reserved"],
+    partial_variables={"legend_note": LEGEND_NOTE}
+)
+
+# Slot grid used when placement is done locally (hybrid mode)
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+BASE_TIME_SLOTS = [
+    {"start": "08:00", "end": "09:15"},
+    {"start": "09:30", "end": "10:45"},
+    {"start": "11:00", "end": "12:15"},
+    {"start": "12:30", "end": "13:45"},
+    {"start": "14:00", "end": "15:15"},
+    {"start": "15:30", "end": "16:45"},
+    {"start": "17:00", "end": "18:15"}
+]
+BLOCKED_SLOTS = [("Friday", "12:30")]
+
+MODEL_NAME = "gemini-2.0-flash-exp"
+TEMPERATURE = 0.5
+
 class TimetableGenerator:
     def __init__(self):
         self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.5,
+            model=MODEL_NAME,
+            temperature=TEMPERATURE,
             google_api_key=GOOGLE_API_KEY
         )
+        self.cache = TimetableCache()
+
+    def cache_key(self, mode, teachers_df, rooms_df):
+        """Content hash of everything that determines a generated timetable"""
+        return TimetableCache.key(
+            teachers_df, rooms_df,
+            mode=mode,
+            constraints=TIMETABLE_CONSTRAINTS,
+            prompt=TIMETABLE_PROMPT.template,
+            model=MODEL_NAME,
+            temperature=TEMPERATURE,
+            time_slots=BASE_TIME_SLOTS,
+            blocked_slots=BLOCKED_SLOTS
+        )
         
     def validate_data(self, df, required_columns, file_type):
         """Validate input data files"""
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            raise ValueError(f"{file_type} file missing columns: {', '.join(missing_cols)}")
-        
-        empty_cols = df.columns[df.isna().any()].tolist()
-        if empty_cols:
-            raise ValueError(f"{file_type} file has empty values in columns: {', '.join(empty_cols)}")
+        validate_schema(df, required_columns, file_type)
     
     def load_data(self, teachers_file, rooms_file):
         """Load and validate input data"""
         try:
-            teachers_df = pd.read_excel(teachers_file)
-            rooms_df = pd.read_excel(rooms_file)
-            
-            self.validate_data(
-                teachers_df,
-                ['Name', 'Course', 'Course Code', 'Course Type', 'Department'],
-                'Teachers'
-            )
-            self.validate_data(
-                rooms_df,
-                ['Room Name', 'Room Type', 'Capacity'],
-                'Rooms'
-            )
-            
+            # Parsed once per distinct upload; schema is checked on every load
+            teachers_df = load_sheet(teachers_file, TEACHER_COLUMNS, 'Teachers')
+            rooms_df = load_sheet(rooms_file, ROOM_COLUMNS, 'Rooms')
             return teachers_df, rooms_df
             
         except Exception as e:
@@ -135,101 +192,98 @@ class TimetableGenerator:
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {str(e)}")
             
-    def generate_timetable(self, teachers_df, rooms_df):
-        """Generate timetable using LangChain and Gemini"""
-        try:
-            # Format data for prompt
-            teachers_info = "\n".join([
-                f"Teacher: {row['Name']}, Course: {row['Course']}, Code: {row['Course Code']}, "
-                f"Type: {row['Course Type']}, Department: {row['Department']}"
-                for _, row in teachers_df.iterrows()
-            ])
-            
-            rooms_info = "\n".join([
-                f"Room: {row['Room Name']}, Type: {row['Room Type']}, Capacity: {row['Capacity']}"
-                for _, row in rooms_df.iterrows()
-            ])
-            
-            prompt = PromptTemplate(
-                template="""
-{constraints}
+    def format_teachers(self, teachers_df):
+        """Teacher rows as a compact, dictionary-encoded prompt table"""
+        return encode_teachers(teachers_df[TEACHER_COLUMNS])
 
-Using this data, generate a complete weekly timetable:
+    def format_rooms(self, rooms_df):
+        """Room rows as a compact, dictionary-encoded prompt table"""
+        return encode_rooms(rooms_df[ROOM_COLUMNS])
 
-TEACHERS INFORMATION:
-{teachers}
+    def prompt_size_report(self, teachers_df, rooms_df):
+        """Estimated prompt tokens for the sheets, the previous labelled lines vs. the encoded tables"""
+        before = labelled_rows(teachers_df, TEACHER_LABELS) + "\n" + labelled_rows(rooms_df, ROOM_LABELS)
+        after = self.format_teachers(teachers_df) + "\n" + self.format_rooms(rooms_df)
+        return prompt_size(before, after)
 
-ROOMS INFORMATION:
-{rooms}
+    def sort_timetable(self, timetable_df):
+        """Sort by day and time"""
+        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+        timetable_df['DayOrder'] = pd.Categorical(timetable_df['Day'], categories=day_order, ordered=True)
+        timetable_df = timetable_df.sort_values(['DayOrder', 'StartTime'])
+        return timetable_df.drop('DayOrder', axis=1)
 
-Return ONLY a JSON array where each entry has this exact format:
-{{
-    "Day": "Monday",
-    "StartTime": "08:00",
-    "EndTime": "09:15",
-    "CourseCode": "CS101",
-    "Course": "Programming Fundamentals"
-    "CourseType": "Theory",
-    "Room": "Room Name",
-    "Teacher": "Teacher Name"
-}}
+    def stream_timetable(self, teachers_df, rooms_df):
+        """Yield validated timetable entries as soon as the model finishes writing each one"""
+        prompt_text = TIMETABLE_PROMPT.format(
+            constraints=TIMETABLE_CONSTRAINTS,
+            teachers=self.format_teachers(teachers_df),
+            rooms=self.format_rooms(rooms_df),
+            reserved="None"
+        )
+        parser = StreamingArrayParser()
+        self.stream_errors = parser.errors
+        for chunk in self.llm.stream(prompt_text):
+            for entry in parser.feed(chunk.content):
+                try:
+                    yield self.validate_timetable_entry(entry)
+                except ValueError as e:
+                    self.stream_errors.append(f"{entry}: {e}")
+        if parser.pending:
+            self.stream_errors.append("Response ended inside an unfinished entry (truncated output)")
 
-Return only the JSON array with no additional text or explanations.""",
-                input_variables=["constraints", "teachers", "rooms"]
-            )
+    def generate_timetable_partitioned(self, teachers_df, rooms_df, max_concurrency=4):
+        """Generate one department/semester at a time, concurrently, and merge without clashes"""
+        try:
+            chain = LLMChain(llm=self.llm, prompt=TIMETABLE_PROMPT)
+            rooms_info = self.format_rooms(rooms_df)
+
+            async def generate_partition(teachers_part, reserved_text):
+                response = await chain.arun(
+                    constraints=TIMETABLE_CONSTRAINTS,
+                    teachers=self.format_teachers(teachers_part),
+                    rooms=rooms_info,
+                    reserved=reserved_text
+                )
+                return self.parse_json_response(response)
+
+            reservations = ReservationTable(DAYS, BASE_TIME_SLOTS, rooms_df, teachers_df, BLOCKED_SLOTS)
+            timetable_df, report = asyncio.run(generate_partitioned(
+                partition_teachers(teachers_df),
+                reservations,
+                generate_partition,
+                max_concurrency=max_concurrency
+            ))
+            if timetable_df.empty:
+                raise ValueError("No partition produced any timetable entries")
+
+            return self.sort_timetable(timetable_df), report
 
-            # Create and run chain
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            response = chain.run(
-                constraints=TIMETABLE_CONSTRAINTS,
-                teachers=teachers_info,
-                rooms=rooms_info
-            )
-            
-            # Parse and validate response
-            timetable_data = self.parse_json_response(response)
-            
-            # Convert to DataFrame
-            timetable_df = pd.DataFrame(timetable_data)
-            
-            # Sort by day and time
-            day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-            timetable_df['DayOrder'] = pd.Categorical(timetable_df['Day'], categories=day_order, ordered=True)
-            timetable_df = timetable_df.sort_values(['DayOrder', 'StartTime'])
-            timetable_df = timetable_df.drop('DayOrder', axis=1)
-            
-            return timetable_df
-            
         except Exception as e:
             raise Exception(f"Error generating timetable: {str(e)}")
 
-    def export_to_excel(self, df, filename):
-        """Export timetable to formatted Excel file"""
+    def generate_timetable_hybrid(self, teachers_df, rooms_df, batch_size=25, seed=None):
+        """Use Gemini only to infer course metadata in small batches, then place sessions locally"""
         try:
-            writer = pd.ExcelWriter(filename, engine='openpyxl')
-            df.to_excel(writer, index=False, sheet_name='Timetable')
-            
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Timetable']
-            
-            # Format columns
-            for column in worksheet.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-            
-            writer.close()
-            return filename
+            metadata_prompt = PromptTemplate(template="{prompt}", input_variables=["prompt"])
+            chain = LLMChain(llm=self.llm, prompt=metadata_prompt)
+            builder = HybridTimetableBuilder(
+                lambda prompt: chain.run(prompt=prompt),
+                DAYS,
+                BASE_TIME_SLOTS,
+                blocked_slots=BLOCKED_SLOTS,
+                seed=seed
+            )
+            timetable_df, unplaced = builder.build(teachers_df, rooms_df, batch_size)
+
+            return self.sort_timetable(timetable_df), unplaced, builder.stats
+
         except Exception as e:
-            raise Exception(f"Error exporting to Excel: {str(e)}")
+            raise Exception(f"Error generating timetable: {str(e)}")
+
+    def check_constraints(self, timetable_df, rooms_df):
+        """Deterministically check the generated timetable for clashes and rule violations"""
+        return validate_timetable(timetable_df, rooms_df, max_daily_classes=3)
 
 def main():
     st.set_page_config(page_title="UMT Timetable Generator", layout="wide")
@@ -240,11 +294,11 @@ def main():
     # File uploaders
     col1, col2 = st.columns(2)
     with col1:
-        teachers_file = st.file_uploader("Upload Teachers Data (Excel)", type=['xlsx'])
+        teachers_file = st.file_uploader("Upload Teachers Data (Excel, CSV or Parquet)", type=['xlsx', 'csv', 'parquet'])
         if teachers_file:
             st.success("Teachers file uploaded successfully!")
     with col2:
-        rooms_file = st.file_uploader("Upload Rooms Data (Excel)", type=['xlsx'])
+        rooms_file = st.file_uploader("Upload Rooms Data (Excel, CSV or Parquet)", type=['xlsx', 'csv', 'parquet'])
         if rooms_file:
             st.success("Rooms file uploaded successfully!")
     
@@ -264,12 +318,74 @@ def main():
             with tab2:
                 st.dataframe(rooms_df, use_container_width=True)
             
+            mode = st.radio(
+                "Generation mode",
+                [
+                    "Hybrid (LLM course analysis + exact placement)",
+                    "LLM per department (parallel)",
+                    "Full LLM timetable"
+                ]
+            )
+            if not mode.startswith("Hybrid"):
+                size = generator.prompt_size_report(teachers_df, rooms_df)
+                st.caption(
+                    f"Sheet data in the prompt: ~{size['tokens_after']} tokens "
+                    f"(~{size['tokens_before']} in the previous labelled format, {size['saved_pct']}% saved)"
+                )
+            export_format = st.selectbox(
+                "Download format",
+                ["Excel", "Excel with per-teacher, per-room and per-day sheets", "CSV", "Parquet"]
+            )
+            use_cache = st.checkbox("Reuse the cached result for identical inputs", value=True)
+            cache_key = generator.cache_key(mode, teachers_df, rooms_df)
+
             # Generate button
             if st.button("Generate Timetable", type="primary"):
                 with st.spinner("Generating timetable... This may take a few minutes."):
                     try:
-                        timetable_df = generator.generate_timetable(teachers_df, rooms_df)
+                        cached = generator.cache.get(cache_key) if use_cache else None
+                        if cached is not None:
+                            timetable_df, violations = cached
+                            st.info("Identical inputs were generated before; showing the cached timetable.")
+                        else:
+                            if mode.startswith("Hybrid"):
+                                timetable_df, unplaced, llm_stats = generator.generate_timetable_hybrid(teachers_df, rooms_df)
+                                st.caption(
+                                    f"{llm_stats['llm_calls']} LLM calls, ~{llm_stats['prompt_tokens']} prompt tokens, "
+                                    f"~{llm_stats['response_tokens']} response tokens"
+                                )
+                                for core in unplaced:
+                                    st.warning(
+                                        f"Could not place {core['course']['code']} session {core['session'] + 1}: {core['reason']}"
+                                    )
+                            elif mode.startswith("LLM per department"):
+                                timetable_df, merge_report = generator.generate_timetable_partitioned(teachers_df, rooms_df)
+                                st.caption(
+                                    f"{len(merge_report['partitions'])} partitions, "
+                                    f"{len(merge_report['repaired'])} cross-partition clashes repaired, "
+                                    f"{len(merge_report['dropped'])} entries dropped"
+                                )
+                                for part in merge_report['partitions']:
+                                    if part['error']:
+                                        st.warning(f"Partition {part['partition']} failed: {part['error']}")
+                            else:
+                                # Stream entries into a live table; it is cleared before the final table below
+                                live_table = st.empty()
+                                entries = []
+                                for entry in generator.stream_timetable(teachers_df, rooms_df):
+                                    entries.append(entry)
+                                    if len(entries) % 5 == 1:
+                                        live_table.dataframe(pd.DataFrame(entries), use_container_width=True, hide_index=True)
+                                live_table.empty()
+                                for error in generator.stream_errors:
+                                    st.warning(f"Skipped invalid entry: {error}")
+                                if not entries:
+                                    raise ValueError("No valid timetable entries in the response")
+                                timetable_df = generator.sort_timetable(pd.DataFrame(entries))
                         
+                            violations = generator.check_constraints(timetable_df, rooms_df)
+                            generator.cache.put(cache_key, (timetable_df, violations))
+
                         # Display timetable
                         st.subheader("Generated Timetable")
                         st.dataframe(
@@ -277,27 +393,24 @@ def main():
                             use_container_width=True,
                             hide_index=True
                         )
+
+                        # Constraint check
+                        if violations.empty:
+                            st.success("No clashes or constraint violations found.")
+                        else:
+                            st.warning(f"Found {len(violations)} constraint violations in the generated timetable.")
+                            st.dataframe(violations, use_container_width=True, hide_index=True)
                         
-                        # Export to Excel
-                        if not os.path.exists('temp'):
-                            os.makedirs('temp')
-                        filename = f"temp/timetable_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                        generator.export_to_excel(timetable_df, filename)
-                        
-                        # Download button
-                        with open(filename, 'rb') as f:
-                            st.download_button(
-                                label="📥 Download Timetable",
-                                data=f,
-                                file_name=os.path.basename(filename),
-                                mime="application/vnd.ms-excel"
-                            )
-                        
-                        # Cleanup temp file
-                        try:
-                            os.remove(filename)
-                        except:
-                            pass
+                        # Export in memory; CSV/Parquet skip the Excel writer for very large timetables
+                        file_format = {"CSV": "csv", "Parquet": "parquet"}.get(export_format, "xlsx")
+                        views = DEFAULT_VIEWS if export_format.startswith("Excel with") else ()
+                        data, mime = export_timetable(timetable_df, file_format, views)
+                        st.download_button(
+                            label="📥 Download Timetable",
+                            data=data,
+                            file_name=f"timetable_{datetime.now().strftime('%Y%m%d_%H%M')}.{file_format}",
+                            mime=mime
+                        )
                             
                     except Exception as e:
                         st.error("Failed to generate timetable. Please try again.")
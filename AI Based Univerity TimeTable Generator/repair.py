@@ -0,0 +1,184 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from occupancy import OccupancyIndex
+from optimizer import LocalSearchOptimizer
+from solver import ConstraintSolver, class_size, slot_span
+
+ASSIGNED_KEYS = ('assigned_teacher', 'teacher_department', 'assigned_room', 'assigned_day', 'assigned_time_slot')
+
+
+def course_of(record: Dict) -> Dict:
+    """The course dict a scheduled record was built from"""
+    return {key: value for key, value in record.items() if key not in ASSIGNED_KEYS}
+
+
+class IncrementalRescheduler:
+    """Repairs a published timetable after a change instead of re-solving it.
+
+    Only sessions touched by the change (a closed room, an unavailable
+    teacher) are released. Each is first kept at its day and time with
+    another free room or another of the course's teachers; only those that
+    cannot stay put, plus newly added sections, go through the solver,
+    which sees every untouched session as fixed occupancy. The solver only
+    knows the hard constraints, so a short LocalSearchOptimizer pass then
+    moves just those sessions again to shed the soft costs they picked up
+    (a teacher's fourth class of the day, a core clash).
+    """
+
+    def __init__(self, occupancy: OccupancyIndex, suitable_rooms: Callable[[str, int], Sequence[str]],
+                 day_gap: int = 1, seed: Optional[int] = None, max_daily_classes: int = 3,
+                 polish_moves: int = 200, polish_budget: float = 1.0):
+        self.occupancy = occupancy
+        self.suitable_rooms = suitable_rooms
+        self.day_gap = day_gap
+        self.seed = seed
+        self.max_daily_classes = max_daily_classes
+        # Local search moves per re-placed session, and a time cap for the whole pass
+        self.polish_moves = polish_moves
+        self.polish_budget = polish_budget
+
+    def repair(self, timetable: List[Dict], removed_rooms: Iterable[str] = (),
+               teacher_unavailability: Optional[Dict[str, List]] = None,
+               added_courses: Iterable[Dict] = ()):
+        """Return (repaired timetable, change report).
+
+        `teacher_unavailability` maps a teacher to day names (whole day off)
+        and/or (day, slot start) pairs.
+        """
+        started = time.perf_counter()
+        occ = self.occupancy
+        removed_rooms = set(removed_rooms)
+        teacher_unavailability = teacher_unavailability or {}
+
+        unavailable = {}
+        for teacher, entries in teacher_unavailability.items():
+            for entry in entries:
+                day, slot_start = (entry, None) if isinstance(entry, str) else entry
+                unavailable.setdefault((teacher, day), set()).add(slot_start)
+
+        def teacher_blocked(teacher, day, start, length):
+            slots = unavailable.get((teacher, day))
+            if not slots:
+                return False
+            s = occ.slot_index[start]
+            return None in slots or any(occ.slot_index[u] in range(s, s + length) for u in slots if u)
+
+        kept, affected = [], []
+        for record in timetable:
+            start = record['assigned_time_slot']['start']
+            if record['assigned_room'] in removed_rooms or teacher_blocked(
+                    record['assigned_teacher'], record['assigned_day'], start, slot_span(record)):
+                affected.append(record)
+            else:
+                occ.reserve(record['assigned_day'], start, record['assigned_room'], record['assigned_teacher'],
+                            slot_span(record))
+                kept.append(record)
+
+        for room in removed_rooms:
+            occ.close_room(room)
+        for (teacher, day), slots in unavailable.items():
+            for slot_start in slots:
+                occ.block_teacher(teacher, day, slot_start)
+
+        # Days each (course, teacher) already meets on, for the day-gap rule
+        fixed_days = {}
+        for record in kept:
+            fixed_days.setdefault(self._course_teacher(record, record['assigned_teacher']), []).append(
+                record['assigned_day'])
+
+        reassigned, leftovers = [], []
+        for record in affected:
+            repaired = self._repair_in_place(record, fixed_days)
+            if repaired is None:
+                leftovers.append(record)
+            else:
+                kept.append(repaired)
+                fixed_days.setdefault(self._course_teacher(repaired, repaired['assigned_teacher']), []).append(
+                    repaired['assigned_day'])
+                reassigned.append({'before': record, 'after': repaired})
+
+        # Leftovers are re-solved one session at a time; remember which record each came from
+        origins = {}
+        to_solve = []
+        for record in leftovers:
+            course = {**course_of(record), 'weekly_frequency': 1}
+            origins[id(course)] = record
+            to_solve.append(course)
+        to_solve.extend(added_courses)
+        result = ConstraintSolver(
+            occ, self.suitable_rooms, seed=self.seed, day_gap=self.day_gap, fixed_days=fixed_days
+        ).solve(to_solve)
+
+        placed = []
+        for placement in result.placements:
+            original = origins.get(id(placement['course']))
+            course = course_of(original) if original else placement['course']
+            placed.append((original, len(kept)))
+            kept.append({
+                **course,
+                'assigned_teacher': placement['teacher'],
+                'assigned_room': placement['room'],
+                'assigned_day': placement['day'],
+                'assigned_time_slot': placement['time_slot'],
+            })
+
+        movable = [index for _, index in placed]
+        optimizer = LocalSearchOptimizer(occ, self.suitable_rooms, max_daily_classes=self.max_daily_classes,
+                                         day_gap=self.day_gap, seed=self.seed)
+        kept, soft_cost = optimizer.optimize(kept, self.polish_budget, movable=movable,
+                                             max_iterations=self.polish_moves * len(movable))
+
+        moved, added = [], []
+        for original, index in placed:
+            if original:
+                moved.append({'before': original, 'after': kept[index]})
+            else:
+                added.append(kept[index])
+
+        report = {
+            'unchanged': len(timetable) - len(affected),
+            'reassigned': reassigned,
+            'moved': moved,
+            'added': added,
+            'unplaced': result.infeasible,
+            'soft_cost': {'after_placement': soft_cost['initial'], 'final': soft_cost['final']},
+            'seconds': time.perf_counter() - started,
+        }
+        return kept, report
+
+    @staticmethod
+    def _course_teacher(record: Dict, teacher: str) -> tuple:
+        return record.get('code'), record.get('name'), teacher
+
+    def _repair_in_place(self, record: Dict, fixed_days: Dict[tuple, List[str]]) -> Optional[Dict]:
+        """Keep the session's day and time, swapping only the room and/or teacher"""
+        occ = self.occupancy
+        day = record['assigned_day']
+        start = record['assigned_time_slot']['start']
+        length = slot_span(record)
+
+        teachers = [record['assigned_teacher']] + [
+            t for t in record.get('teachers') or [] if t != record['assigned_teacher']
+        ]
+        teacher = next((
+            t for t in teachers
+            if occ.is_teacher_free(day, start, t, length) and not self._breaks_day_gap(record, t, day, fixed_days)
+        ), None)
+        if teacher is None:
+            return None
+
+        rooms = [record['assigned_room']] + list(self.suitable_rooms(record['course_type'], class_size(record)))
+        room = next((r for r in rooms if r in occ.room_index and occ.is_room_free(day, start, r, length)), None)
+        if room is None:
+            return None
+
+        occ.reserve(day, start, room, teacher, length)
+        return {**record, 'assigned_teacher': teacher, 'assigned_room': room}
+
+    def _breaks_day_gap(self, record: Dict, teacher: str, day: str, fixed_days: Dict[tuple, List[str]]) -> bool:
+        d = self.occupancy.day_index[day]
+        return any(
+            abs(self.occupancy.day_index[other] - d) <= self.day_gap
+            for other in fixed_days.get(self._course_teacher(record, teacher), [])
+        )
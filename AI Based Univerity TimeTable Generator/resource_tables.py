@@ -0,0 +1,62 @@
+from bisect import bisect_left
+from types import MappingProxyType
+from typing import Dict, Tuple
+
+import pandas as pd
+
+# Course type -> room type it must be taught in
+ROOM_TYPE_MAPPING = MappingProxyType({
+    'Theory': 'Lecture Hall',
+    'Hardware Lab': 'Hardware Lab',
+    'Computing Lab': 'Computing Lab',
+    'Physics Lab': 'Physics Lab'
+})
+
+
+class ResourceTables:
+    """Immutable lookups over the rooms and teachers sheets, built once at ingestion.
+
+    The placement path only ever reads these tuples and mappings, so no
+    DataFrame is filtered or indexed per course or per placed session.
+    """
+
+    def __init__(self, rooms_df: pd.DataFrame, teachers_df: pd.DataFrame):
+        self.room_names = tuple(dict.fromkeys(rooms_df['Room Name'].tolist()))
+        self.rooms_by_type = MappingProxyType({
+            room_type: tuple(dict.fromkeys(group['Room Name'].tolist()))
+            for room_type, group in rooms_df.groupby('Room Type', sort=False, observed=True)
+        })
+
+        # Per room type: (capacities, room names), both in ascending capacity order
+        if 'Capacity' in rooms_df.columns:
+            ordered = rooms_df.assign(
+                Capacity=pd.to_numeric(rooms_df['Capacity'], errors='coerce').fillna(0).astype(int)
+            ).sort_values(['Capacity', 'Room Name'], kind='stable')
+            self.rooms_by_capacity = MappingProxyType({
+                room_type: (tuple(group['Capacity'].tolist()), tuple(group['Room Name'].tolist()))
+                for room_type, group in ordered.groupby('Room Type', sort=False, observed=True)
+            })
+        else:
+            self.rooms_by_capacity = MappingProxyType({})
+
+        # First row per teacher, matching the sheet's original lookup semantics
+        records = teachers_df.drop_duplicates('Name').to_dict('records')
+        self.teacher_names = tuple(record['Name'] for record in records)
+        self.teachers = MappingProxyType({record['Name']: MappingProxyType(record) for record in records})
+
+    def room_type_for(self, course_type: str) -> str:
+        return ROOM_TYPE_MAPPING.get(course_type, 'Lecture Hall')
+
+    def suitable_rooms(self, course_type: str, class_size: int = 0) -> Tuple[str, ...]:
+        """Rooms of the right type that seat `class_size`, smallest first when capacities are known"""
+        room_type = self.room_type_for(course_type)
+        if room_type not in self.rooms_by_capacity:
+            return self.rooms_by_type.get(room_type, ())
+        capacities, names = self.rooms_by_capacity[room_type]
+        return names[bisect_left(capacities, class_size or 0):]
+
+    def teacher_record(self, teacher: str) -> Dict:
+        return self.teachers.get(teacher, MappingProxyType({}))
+
+    def teacher_department(self, teacher: str) -> str:
+        return self.teacher_record(teacher).get('Department', 'N/A')
@@ -0,0 +1,40 @@
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class CourseType(str, Enum):
+    THEORY = "Theory"
+    HARDWARE_LAB = "Hardware Lab"
+    COMPUTING_LAB = "Computing Lab"
+    PHYSICS_LAB = "Physics Lab"
+
+
+class Course(BaseModel):
+    name: str
+    code: str
+    course_type: CourseType
+    teachers: List[str]
+    required_rooms: List[str] = []
+    weekly_frequency: int = 2
+    duration: int = 75
+    class_size: int = 0
+    semester: Optional[str] = None
+    elective: bool = False
+
+
+class ScheduledCourse(Course):
+    assigned_teacher: Optional[str] = None
+    assigned_room: Optional[str] = None
+    assigned_day: Optional[str] = None
+    assigned_time_slot: Optional[Dict] = None
+
+
+# Typed payloads handed from one crew stage to the next
+class CourseAnalysis(BaseModel):
+    courses: List[Course]
+
+
+class SchedulePlan(BaseModel):
+    scheduled_courses: List[ScheduledCourse]
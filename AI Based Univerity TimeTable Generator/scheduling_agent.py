@@ -0,0 +1,203 @@
+import logging
+import os
+import random
+from typing import Tuple
+
+from multistart import run_multistart
+from occupancy import OccupancyIndex
+from optimizer import LocalSearchOptimizer
+from repair import IncrementalRescheduler
+from resource_tables import ResourceTables
+from solver import ConstraintSolver, class_size, slot_span, weekly_sessions
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulingSettings:
+    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+    BASE_TIME_SLOTS = [
+        {"start": "08:00", "end": "09:15"},
+        {"start": "09:30", "end": "10:45"},
+        {"start": "11:00", "end": "12:15"},
+        {"start": "12:30", "end": "13:45"},
+        {"start": "14:00", "end": "15:15"},
+        {"start": "15:30", "end": "16:45"},
+        {"start": "17:00", "end": "18:15"}
+    ]
+    # No classes in the Friday 12:30 slot
+    BLOCKED_SLOTS = [("Friday", "12:30")]
+    # Days that must separate two sessions of a course taught by the same teacher
+    SAME_COURSE_DAY_GAP = 1
+    # Soft limit on classes per teacher per day
+    MAX_DAILY_CLASSES = 3
+
+
+class SchedulingAgent:
+    def __init__(self, rooms_df, teachers_df, mode='random', seed=None):
+        self.rooms_df = rooms_df
+        self.teachers_df = teachers_df
+        self.tables = ResourceTables(rooms_df, teachers_df)
+        self.mode = mode
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.infeasible = []
+        self.occupancy = None
+        self.initialize_occupancy_tracking()
+
+    def initialize_occupancy_tracking(self):
+        self.occupancy = OccupancyIndex(
+            SchedulingSettings.DAYS,
+            SchedulingSettings.BASE_TIME_SLOTS,
+            rooms=self.tables.room_names,
+            teachers=self.tables.teacher_names
+        )
+        for day, slot_start in SchedulingSettings.BLOCKED_SLOTS:
+            self.occupancy.block(day, slot_start)
+
+    def schedule_courses(self, courses):
+        if self.mode == 'solver':
+            return self.solve_courses(courses)
+
+        scheduled_courses = []
+        for course in courses:
+            scheduled_courses.extend(self.schedule_course(course))
+        return scheduled_courses
+
+    def schedule_course(self, course):
+        possible_rooms = self._get_suitable_rooms(course['course_type'], class_size(course))
+        length = slot_span(course)
+        scheduled_sessions = []
+        teacher_days = {}
+
+        for session in range(weekly_sessions(course)):
+            teachers = list(course['teachers'])
+            self.rng.shuffle(teachers)
+            for teacher in teachers:
+                # One vectorized query yields every (day, start, room) the whole span fits into;
+                # rooms come smallest first, so the first room seen per (day, start) is the best fit
+                options = {}
+                for day, start, room in self.occupancy.free_slots_for_teacher(teacher, possible_rooms, length):
+                    if all(
+                        abs(self.occupancy.day_index[day] - used) > SchedulingSettings.SAME_COURSE_DAY_GAP
+                        for used in teacher_days.get(teacher, [])
+                    ):
+                        options.setdefault((day, start), room)
+                if options:
+                    day, start = self.rng.choice(list(options))
+                    room = options[(day, start)]
+                    self.occupancy.reserve(day, start, room, teacher, length)
+                    teacher_days.setdefault(teacher, []).append(self.occupancy.day_index[day])
+                    time_slot = self.occupancy.span_time_slot(start, length)
+                    scheduled_sessions.append(self._scheduled_record(course, teacher, room, day, time_slot))
+                    break
+            else:
+                self.infeasible.append({
+                    'course': course,
+                    'session': session,
+                    'reason': "no free room and teacher combination left",
+                    'conflicts_with': []
+                })
+
+        return scheduled_sessions
+
+    def solve_courses(self, courses):
+        solver = ConstraintSolver(
+            self.occupancy,
+            self._get_suitable_rooms,
+            seed=self.seed,
+            day_gap=SchedulingSettings.SAME_COURSE_DAY_GAP
+        )
+        result = solver.solve(courses)
+        self.infeasible = result.infeasible
+        logger.info(f"Solver placed {len(result.placements)} sessions in {result.seconds:.2f}s "
+                    f"({result.backtracks} backtracks, {len(result.infeasible)} infeasible)")
+        return [
+            self._scheduled_record(p['course'], p['teacher'], p['room'], p['day'], p['time_slot'])
+            for p in result.placements
+        ]
+
+    def schedule_courses_multistart(self, courses, runs=None, max_workers=None, time_budget=0.0):
+        """Solve with `runs` seeds in parallel processes and keep the best timetable"""
+        runs = runs or os.cpu_count() or 1
+        base_seed = self.seed or 0
+        tables = {
+            'days': SchedulingSettings.DAYS,
+            'time_slots': SchedulingSettings.BASE_TIME_SLOTS,
+            'blocked_slots': SchedulingSettings.BLOCKED_SLOTS,
+            'rooms': self.occupancy.room_names,
+            'teachers': self.occupancy.teacher_names,
+            'suitable_rooms': {
+                key: self._get_suitable_rooms(*key)
+                for key in {(course['course_type'], class_size(course)) for course in courses}
+            },
+            'courses': courses,
+            'day_gap': SchedulingSettings.SAME_COURSE_DAY_GAP,
+            'max_daily_classes': SchedulingSettings.MAX_DAILY_CLASSES,
+            'time_budget': time_budget,
+        }
+        best, stats = run_multistart(tables, [base_seed + k for k in range(runs)], max_workers)
+
+        self.infeasible = best['infeasible']
+        scheduled_courses = []
+        for record in best['schedule']:
+            time_slot = record['assigned_time_slot']
+            self.occupancy.reserve(record['assigned_day'], time_slot['start'], record['assigned_room'],
+                                   record['assigned_teacher'], slot_span(record))
+            scheduled_courses.append(self._scheduled_record(
+                record, record['assigned_teacher'], record['assigned_room'], record['assigned_day'], time_slot
+            ))
+        logger.info(f"Best of {runs} runs: seed {best['seed']}, {best['unplaced']} unplaced, "
+                    f"soft cost {best['soft_cost']}")
+        return scheduled_courses, stats
+
+    def reschedule(self, timetable, removed_rooms=(), teacher_unavailability=None, added_courses=()):
+        """Repair a published timetable after a change, moving as few sessions as possible"""
+        self.initialize_occupancy_tracking()
+        rescheduler = IncrementalRescheduler(
+            self.occupancy,
+            self._get_suitable_rooms,
+            day_gap=SchedulingSettings.SAME_COURSE_DAY_GAP,
+            seed=self.seed,
+            max_daily_classes=SchedulingSettings.MAX_DAILY_CLASSES
+        )
+        repaired, report = rescheduler.repair(timetable, removed_rooms, teacher_unavailability, added_courses)
+        self.infeasible = report['unplaced']
+        logger.info(f"Rescheduled in {report['seconds'] * 1000:.1f}ms: {report['unchanged']} unchanged, "
+                    f"{len(report['reassigned'])} reassigned in place, {len(report['moved'])} moved, "
+                    f"{len(report['added'])} added, {len(report['unplaced'])} unplaced")
+        return [
+            self._scheduled_record(record, record['assigned_teacher'], record['assigned_room'],
+                                   record['assigned_day'], record['assigned_time_slot'])
+            for record in repaired
+        ], report
+
+    def improve_schedule(self, schedule, time_budget=5.0):
+        """Spend up to `time_budget` seconds trading soft-constraint violations away"""
+        optimizer = LocalSearchOptimizer(
+            self.occupancy,
+            self._get_suitable_rooms,
+            max_daily_classes=SchedulingSettings.MAX_DAILY_CLASSES,
+            day_gap=SchedulingSettings.SAME_COURSE_DAY_GAP,
+            seed=self.seed
+        )
+        improved, report = optimizer.optimize(schedule, time_budget)
+        logger.info(f"Soft cost {report['initial']['total']} -> {report['final']['total']} "
+                    f"after {report['iterations']} moves in {report['seconds']:.2f}s")
+        return [
+            self._scheduled_record(record, record['assigned_teacher'], record['assigned_room'],
+                                   record['assigned_day'], record['assigned_time_slot'])
+            for record in improved
+        ], report
+
+    def _scheduled_record(self, course, teacher, room, day, time_slot):
+        return {
+            **course,
+            'assigned_teacher': teacher,
+            'teacher_department': self.tables.teacher_department(teacher),
+            'assigned_room': room,
+            'assigned_day': day,
+            'assigned_time_slot': time_slot
+        }
+
+    def _get_suitable_rooms(self, course_type: str, class_size: int = 0) -> Tuple[str, ...]:
+        return self.tables.suitable_rooms(course_type, class_size)
@@ -0,0 +1,344 @@
+import heapq
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from occupancy import OccupancyIndex, span_starts
+
+SLOT_MINUTES = 75
+LAB_SLOT_SPAN = 2
+
+
+def is_lab(course: Dict) -> bool:
+    return 'Lab' in str(course.get('course_type', ''))
+
+
+def slot_span(course: Dict) -> int:
+    """Number of consecutive base slots one session of the course occupies"""
+    span = -(-int(course.get('duration') or SLOT_MINUTES) // SLOT_MINUTES)
+    if is_lab(course):
+        span = max(span, LAB_SLOT_SPAN)
+    return max(span, 1)
+
+
+def class_size(course: Dict) -> int:
+    return int(course.get('class_size') or 0)
+
+
+def weekly_sessions(course: Dict) -> int:
+    """Sessions per week; labs meet once and theory courses twice unless stated"""
+    return int(course.get('weekly_frequency') or (1 if is_lab(course) else 2))
+
+
+class Session:
+    """One weekly meeting of a course, the unit the solver places"""
+
+    __slots__ = ('course', 'course_idx', 'number', 'teacher_ids', 'pool', 'length')
+
+    def __init__(self, course: Dict, course_idx: int, number: int, teacher_ids: List[int], pool: tuple, length: int):
+        self.course = course
+        self.course_idx = course_idx
+        self.number = number
+        self.teacher_ids = teacher_ids
+        self.pool = pool
+        self.length = length
+
+
+class SolverResult:
+    def __init__(self, placements: List[Dict], infeasible: List[Dict], backtracks: int, seconds: float):
+        self.placements = placements
+        self.infeasible = infeasible
+        self.backtracks = backtracks
+        self.seconds = seconds
+
+
+class ConstraintSolver:
+    """Deterministic placement by forward checking and backtracking.
+
+    Every weekly session of every course is a variable whose domain is the
+    set of (day, start slot, teacher) values still open to it; labs span
+    several consecutive slots and are reserved as one block. Rooms are
+    chosen best-fit: the smallest free room that seats the class. Sessions are
+    placed most-constrained-first; each placement prunes the domains of
+    sessions sharing the teacher, the course or the room pool, so dead ends
+    surface immediately as empty domains. Backtracking is bounded by
+    `max_backtracks` overall and by `max_session_backtracks` per session
+    that runs dry; sessions that still cannot be placed are reported with
+    the placements that eliminated their options (their infeasibility core).
+
+    Before searching, demand is checked against pooled capacity: the
+    sessions that can only use a room pool (or a subset of it) and the
+    sessions of a single teacher must fit in the free slots they share.
+    The surplus is reported infeasible up front instead of being found by
+    exhausting the backtracking budget.
+
+    Sessions of the same course taught by the same teacher are kept more
+    than `day_gap` days apart, including from sessions already placed
+    outside the solver, which are passed as `fixed_days`:
+    {(course code, course name, teacher): [day names]}.
+    """
+
+    def __init__(self, occupancy: OccupancyIndex, suitable_rooms: Callable[[str, int], Sequence[str]],
+                 seed: Optional[int] = None, max_backtracks: int = 10000, day_gap: int = 1,
+                 fixed_days: Optional[Dict[tuple, List[str]]] = None, max_session_backtracks: int = 50):
+        self.occupancy = occupancy
+        self.suitable_rooms = suitable_rooms
+        self.rng = random.Random(seed)
+        self.max_backtracks = max_backtracks
+        self.max_session_backtracks = max_session_backtracks
+        self.day_gap = day_gap
+        self.fixed_days = fixed_days or {}
+
+    def solve(self, courses: List[Dict]) -> SolverResult:
+        started = time.perf_counter()
+        self._build(courses)
+        self._check_capacity()
+
+        stack = []
+        while True:
+            i = self._select()
+            if i is None:
+                break
+            values = self._order_values(i)
+            if not values:
+                self.failures[i] = self.failures.get(i, 0) + 1
+                if self.failures[i] > self.max_session_backtracks or not self._backtrack(stack):
+                    self._mark_infeasible(i)
+                continue
+            stack.append((i, values, self._assign(i, values.pop())))
+
+        placements = [self._describe(i) for i in sorted(self.assignment)]
+        return SolverResult(placements, self.infeasible, self.backtracks, time.perf_counter() - started)
+
+    def _describe(self, i: int) -> Dict:
+        session = self.sessions[i]
+        d, s, t, r = self.assignment[i]
+        occ = self.occupancy
+        return {
+            'course': session.course,
+            'session': session.number,
+            'day': occ.days[d],
+            'time_slot': occ.span_time_slot(occ.time_slots[s]['start'], session.length),
+            'length': session.length,
+            'room': occ.room_names[r],
+            'teacher': occ.teacher_names[t],
+        }
+
+    # --- Model construction ---
+
+    def _build(self, courses: List[Dict]):
+        occ = self.occupancy
+        self.sessions = []
+        self.pool_rooms = {}
+        self.pool_pos = {}
+        self.room_pools = {}
+        pools = {}
+        for course_idx, course in enumerate(courses):
+            teacher_ids = [occ.teacher_id(t) for t in dict.fromkeys(course.get('teachers', []))]
+            # Pools keep the best-fit order of suitable_rooms, so the first free room is the tightest fit
+            pool_key = (course['course_type'], class_size(course))
+            if pool_key not in pools:
+                rooms = self.suitable_rooms(*pool_key)
+                pools[pool_key] = tuple(dict.fromkeys(occ.room_id(r) for r in rooms))
+            pool = pools[pool_key]
+            if pool not in self.pool_rooms:
+                self.pool_rooms[pool] = np.array(pool, dtype=int)
+                self.pool_pos[pool] = {r: k for k, r in enumerate(pool)}
+                for r in pool:
+                    self.room_pools.setdefault(r, []).append(pool)
+            length = slot_span(course)
+            for number in range(weekly_sessions(course)):
+                self.sessions.append(Session(course, course_idx, number, teacher_ids, pool, length))
+
+        self.by_teacher = {}
+        self.by_course = {}
+        self.by_pool_length = {}
+        self.pool_lengths = {}
+        for i, session in enumerate(self.sessions):
+            for t in session.teacher_ids:
+                self.by_teacher.setdefault(t, []).append(i)
+            self.by_course.setdefault(session.course_idx, []).append(i)
+            self.by_pool_length.setdefault((session.pool, session.length), []).append(i)
+            self.pool_lengths.setdefault(session.pool, set()).add(session.length)
+
+        self.domains = []
+        open_starts = {}
+        # Sibling sessions, and courses sharing a teacher and pool, start from the same values
+        teacher_values = {}
+        for session in self.sessions:
+            key = (session.pool, session.length)
+            if key not in open_starts:
+                open_starts[key] = span_starts(self._pool_free(session.pool), session.length).any(axis=2)
+            domain = set()
+            for t in session.teacher_ids:
+                fixed_key = (session.course.get('code'), session.course.get('name'), occ.teacher_names[t])
+                fixed = tuple(self.fixed_days.get(fixed_key, ()))
+                values_key = key + (t, fixed)
+                if values_key not in teacher_values:
+                    teacher_starts = span_starts(~occ.teachers[:, :, t] & ~occ.blocked, session.length)
+                    for day in fixed:
+                        d = occ.day_index[day]
+                        teacher_starts[max(0, d - self.day_gap):d + self.day_gap + 1] = False
+                    cells = np.argwhere(open_starts[key] & teacher_starts).tolist()
+                    teacher_values[values_key] = [(d, s, t) for d, s in cells]
+                domain.update(teacher_values[values_key])
+            self.domains.append(domain)
+
+        self.assignment = {}
+        self.infeasible = []
+        self.dropped = set()
+        self.trail = []
+        self.backtracks = 0
+        self.failures = {}
+        self.heap = []
+        for i in range(len(self.sessions)):
+            self._push(i)
+
+    def _pool_free(self, pool: tuple) -> np.ndarray:
+        return self.occupancy.free_rooms(self.pool_rooms[pool])
+
+    def _check_capacity(self):
+        """Drop the sessions that overflow a room pool's or a teacher's free slots"""
+        occ = self.occupancy
+        pool_sets = {pool: set(pool) for pool in self.pool_rooms}
+        # Smallest pools first: a session that only fits a small pool is charged there before any superset
+        for pool in sorted(self.pool_rooms, key=len):
+            if not pool:
+                continue
+            members = [i for i, session in enumerate(self.sessions)
+                       if session.pool and pool_sets[session.pool] <= pool_sets[pool]]
+            self._drop_surplus(members, int(self._pool_free(pool).sum()), f"a pool of {len(pool)} suitable rooms")
+        for t, members in self.by_teacher.items():
+            # Only single-teacher sessions are bound to this teacher's time
+            members = [i for i in members if len(self.sessions[i].teacher_ids) == 1]
+            free = int((~occ.teachers[:, :, t] & ~occ.blocked).sum())
+            self._drop_surplus(members, free, f"teacher {occ.teacher_names[t]}")
+
+    def _drop_surplus(self, members: List[int], free: int, resource: str):
+        members = [i for i in members if i not in self.dropped]
+        needed = demand = sum(self.sessions[i].length for i in members)
+        reason = f"capacity exceeded for {resource}: {free} free slots, {needed} needed"
+        # The sessions listed last give way, so earlier courses in the input keep their places
+        for i in reversed(members):
+            if demand <= free:
+                break
+            demand -= self.sessions[i].length
+            self._mark_infeasible(i, reason)
+
+    # --- Search ---
+
+    def _push(self, i: int):
+        heapq.heappush(self.heap, (len(self.domains[i]), self.rng.random(), i))
+
+    def _select(self) -> Optional[int]:
+        """Pop the unplaced session with the smallest remaining domain"""
+        while self.heap:
+            size, _, i = heapq.heappop(self.heap)
+            if i in self.assignment or i in self.dropped or size != len(self.domains[i]):
+                continue
+            return i
+        return None
+
+    def _order_values(self, i: int) -> List[tuple]:
+        """Domain values, best last: prefer starts with the most free rooms left in the pool"""
+        session = self.sessions[i]
+        free_counts = span_starts(self._pool_free(session.pool), session.length).sum(axis=2)
+        values = list(self.domains[i])
+        self.rng.shuffle(values)
+        values.sort(key=lambda v: free_counts[v[0], v[1]])
+        return values
+
+    def _assign(self, i: int, value: tuple) -> int:
+        d, s, t = value
+        session = self.sessions[i]
+        span = slice(s, s + session.length)
+        pool = session.pool
+        room = int(self.pool_rooms[pool][np.argmax(self._pool_free(pool)[d, span].all(axis=0))])
+        self.occupancy.rooms[d, span, room] = True
+        self.occupancy.teachers[d, span, t] = True
+        self.assignment[i] = (d, s, t, room)
+
+        mark = len(self.trail)
+        n_slots = len(self.occupancy.time_slots)
+
+        # The teacher can no longer start anything that overlaps this span
+        for j in self.by_teacher[t]:
+            for s2 in range(max(0, s - self.sessions[j].length + 1), s + session.length):
+                self._prune(j, (d, s2, t), i)
+
+        # Sibling sessions of the same course and teacher keep their distance in days
+        for j in self.by_course[session.course_idx]:
+            if t in self.sessions[j].teacher_ids:
+                for d2 in range(max(0, d - self.day_gap), min(len(self.occupancy.days), d + self.day_gap + 1)):
+                    for s2 in range(n_slots):
+                        self._prune(j, (d2, s2, t), i)
+
+        # Starts that just lost their last free room in a pool are closed for that pool
+        for other_pool in self.room_pools[room]:
+            after = self._pool_free(other_pool)[d][None]
+            before = after.copy()
+            before[0, span, self.pool_pos[other_pool][room]] = True
+            for length in self.pool_lengths[other_pool]:
+                lost = span_starts(before, length).any(axis=2)[0] & ~span_starts(after, length).any(axis=2)[0]
+                for s2 in np.flatnonzero(lost):
+                    for j in self.by_pool_length[(other_pool, length)]:
+                        for tt in self.sessions[j].teacher_ids:
+                            self._prune(j, (d, int(s2), tt), i)
+        return mark
+
+    def _prune(self, j: int, value: tuple, culprit: int):
+        if j in self.assignment or j in self.dropped or value not in self.domains[j]:
+            return
+        self.domains[j].discard(value)
+        self.trail.append((j, value, culprit))
+        self._push(j)
+
+    def _unassign(self, i: int, mark: int):
+        while len(self.trail) > mark:
+            j, value, _ = self.trail.pop()
+            self.domains[j].add(value)
+            self._push(j)
+        d, s, t, room = self.assignment.pop(i)
+        span = slice(s, s + self.sessions[i].length)
+        self.occupancy.rooms[d, span, room] = False
+        self.occupancy.teachers[d, span, t] = False
+        self._push(i)
+
+    def _backtrack(self, stack: List[tuple]) -> bool:
+        """Undo placements until one can switch to its next value; False once the budget is spent"""
+        while stack and self.backtracks < self.max_backtracks:
+            i, values, mark = stack.pop()
+            self._unassign(i, mark)
+            self.backtracks += 1
+            if values:
+                stack.append((i, values, self._assign(i, values.pop())))
+                return True
+        return False
+
+    def _mark_infeasible(self, i: int, reason: Optional[str] = None):
+        session = self.sessions[i]
+        culprits = sorted({culprit for j, _, culprit in self.trail if j == i})
+        if reason is None:
+            reason = self._infeasible_reason(session)
+        self.infeasible.append({
+            'course': session.course,
+            'session': session.number,
+            'reason': reason,
+            'conflicts_with': [self._conflict_summary(c) for c in culprits if c in self.assignment],
+        })
+        self.dropped.add(i)
+
+    @staticmethod
+    def _infeasible_reason(session: Session) -> str:
+        if not session.pool:
+            return f"no rooms suitable for course type '{session.course['course_type']}'"
+        if not session.teacher_ids:
+            return "no teachers listed"
+        return "every (day, slot, teacher) option is blocked"
+
+    def _conflict_summary(self, i: int) -> Dict:
+        placement = self._describe(i)
+        placement['code'] = placement.pop('course').get('code')
+        return placement
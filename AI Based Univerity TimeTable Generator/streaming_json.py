@@ -0,0 +1,61 @@
+import json
+from typing import Dict, List
+
+
+class StreamingArrayParser:
+    """Incrementally extracts the objects of a JSON array from a text stream.
+
+    Chunks are scanned once with a small string-aware brace counter; every
+    time an object closes it is decoded and returned, so callers get entries
+    while the model is still writing. Text before the opening '[' (e.g. a
+    ```json fence) is ignored, objects that fail to decode are collected in
+    `errors` instead of aborting the stream, and a truncated response still
+    yields every object that was completed.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.errors: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict]:
+        completed = []
+        for char in chunk:
+            if not self.started:
+                self.started = char == '['
+                continue
+            if self.depth == 0:
+                if char == '{':
+                    self.depth = 1
+                    self.buffer = [char]
+                continue
+
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    text = "".join(self.buffer)
+                    try:
+                        completed.append(json.loads(text))
+                    except json.JSONDecodeError:
+                        self.errors.append(text)
+        return completed
+
+    @property
+    def pending(self) -> bool:
+        """True when the stream stopped inside an unfinished object"""
+        return self.depth > 0
@@ -0,0 +1,36 @@
+import json
+
+import pandas as pd
+
+from hybrid_scheduler import HybridTimetableBuilder
+
+TEACHERS = pd.DataFrame([
+    {'Name': 'Alice', 'Course': 'Algorithms', 'Course Code': 'CS201', 'Course Type': 'Theory',
+     'Department': 'Computer Science'},
+    {'Name': 'Bob', 'Course': 'Circuits Lab', 'Course Code': 'EE110', 'Course Type': 'Hardware Lab',
+     'Department': 'Electrical Engineering'},
+])
+
+
+def infer(metadata):
+    builder = HybridTimetableBuilder(lambda prompt: json.dumps(metadata), days=[], time_slots=[])
+    return {course['code']: course for course in builder.infer_courses(TEACHERS)}
+
+
+def test_bad_numbers_fall_back_field_by_field():
+    courses = infer([
+        {'CourseCode': 'CS201', 'WeeklyFrequency': 'twice', 'ClassSize': 45},
+        {'CourseCode': 'EE110', 'WeeklyFrequency': 1, 'ClassSize': -3},
+    ])
+    assert (courses['CS201']['weekly_frequency'], courses['CS201']['class_size']) == (2, 45)
+    assert (courses['EE110']['weekly_frequency'], courses['EE110']['class_size']) == (1, 0)
+
+
+def test_unknown_course_type_keeps_the_sheet_type():
+    courses = infer([
+        {'CourseCode': 'CS201', 'CourseType': 'Seminar'},
+        {'CourseCode': 'EE110', 'CourseType': ['Hardware Lab']},
+    ])
+    assert courses['CS201']['course_type'] == 'Theory'
+    assert courses['EE110']['course_type'] == 'Hardware Lab'
+    assert courses['EE110']['weekly_frequency'] == 1
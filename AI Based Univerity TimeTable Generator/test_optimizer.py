@@ -0,0 +1,55 @@
+import pandas as pd
+
+from ingestion import with_course_groups
+from scheduling_agent import SchedulingAgent
+
+TEACHERS = pd.DataFrame([
+    {'Name': 'Alice', 'Course': 'Algorithms', 'Course Code': 'CS201', 'Course Type': 'Theory',
+     'Department': 'Computer Science', 'Semester': 3, 'Elective': 'No'},
+    {'Name': 'Bob', 'Course': 'Databases', 'Course Code': 'CS202', 'Course Type': 'Theory',
+     'Department': 'Computer Science', 'Semester': 3, 'Elective': 'No'},
+])
+ROOMS = pd.DataFrame([
+    {'Room Name': 'Hall 1', 'Room Type': 'Lecture Hall', 'Capacity': 60},
+    {'Room Name': 'Hall 2', 'Room Type': 'Lecture Hall', 'Capacity': 60},
+])
+COURSES = [
+    {'name': 'Algorithms', 'code': 'CS201', 'course_type': 'Theory', 'teachers': ['Alice'], 'weekly_frequency': 1},
+    {'name': 'Databases', 'code': 'CS202', 'course_type': 'Theory', 'teachers': ['Bob'], 'weekly_frequency': 1},
+]
+
+
+def clashing_schedule(agent, courses):
+    """Both courses on Monday 08:00 in different rooms: hard-feasible, but the same semester"""
+    time_slot = agent.occupancy.span_time_slot('08:00', 1)
+    schedule = []
+    for course, room in zip(courses, ['Hall 1', 'Hall 2']):
+        teacher = course['teachers'][0]
+        agent.occupancy.reserve('Monday', '08:00', room, teacher, 1)
+        schedule.append(agent._scheduled_record(course, teacher, room, 'Monday', time_slot))
+    return schedule
+
+
+def slots(schedule):
+    return {(record['code'], record['assigned_day'], record['assigned_time_slot']['start']) for record in schedule}
+
+
+def test_course_groups_come_from_the_sheet():
+    courses = with_course_groups(COURSES, TEACHERS)
+    assert [(c['semester'], c['elective']) for c in courses] == [('3', False), ('3', False)]
+
+
+def test_core_clash_moves_a_session_only_when_semesters_are_known():
+    agent = SchedulingAgent(ROOMS, TEACHERS, seed=0)
+    schedule = clashing_schedule(agent, with_course_groups(COURSES, TEACHERS))
+    improved, report = agent.improve_schedule(schedule, time_budget=1.0)
+    assert report['initial']['core_clash']['count'] == 1
+    assert report['final']['core_clash']['count'] == 0
+    assert slots(improved) != slots(schedule)
+
+    # Without the sheet columns the same placement carries no clash cost and stays put
+    agent = SchedulingAgent(ROOMS, TEACHERS.drop(columns=['Semester', 'Elective']), seed=0)
+    schedule = clashing_schedule(agent, COURSES)
+    improved, report = agent.improve_schedule(schedule, time_budget=1.0)
+    assert report['initial']['core_clash']['count'] == 0
+    assert slots(improved) == slots(schedule)
@@ -0,0 +1,30 @@
+from collections import Counter
+
+import pandas as pd
+
+from scheduling_agent import SchedulingAgent, SchedulingSettings
+
+ROOMS = pd.DataFrame([{'Room Name': f'Hall {i}', 'Room Type': 'Lecture Hall', 'Capacity': 60} for i in range(3)])
+TEACHERS = pd.DataFrame([{'Name': 'Alice', 'Course': 'Algorithms', 'Course Code': 'CS201', 'Course Type': 'Theory',
+                          'Department': 'Computer Science'}])
+END = {slot['start']: slot['end'] for slot in SchedulingSettings.BASE_TIME_SLOTS}
+
+
+def session(number, day, start):
+    return {'name': f'Course {number}', 'code': f'C{number}', 'course_type': 'Theory', 'teachers': ['Alice'],
+            'weekly_frequency': 1, 'assigned_teacher': 'Alice', 'assigned_room': 'Hall 0', 'assigned_day': day,
+            'assigned_time_slot': {'start': start, 'end': END[start]}}
+
+
+def test_sessions_moved_off_a_lost_day_avoid_days_already_full():
+    # Three classes a day Monday to Friday; with Monday lost, only Saturday has room under the daily maximum
+    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    timetable = [session(3 * d + k, day, start) for d, day in enumerate(days)
+                 for k, start in enumerate(['08:00', '11:00', '14:00'])]
+    for seed in range(5):
+        repaired, report = SchedulingAgent(ROOMS, TEACHERS, seed=seed).reschedule(
+            timetable, teacher_unavailability={'Alice': ['Monday']})
+        assert report['unchanged'] == 12
+        assert [move['after']['assigned_day'] for move in report['moved']] == ['Saturday'] * 3
+        assert max(Counter(record['assigned_day'] for record in repaired).values()) == 3
+        assert report['soft_cost']['final']['teacher_overload']['count'] == 0
@@ -0,0 +1,114 @@
+from collections import Counter
+
+import pandas as pd
+
+from occupancy import OccupancyIndex
+from resource_tables import ResourceTables
+from scheduling_agent import SchedulingSettings
+from solver import ConstraintSolver
+
+
+def theory(code, teacher, weekly_frequency=1):
+    return {'name': code, 'code': code, 'course_type': 'Theory', 'teachers': [teacher],
+            'weekly_frequency': weekly_frequency}
+
+
+def lab(code, teacher, lab_type='Computing Lab'):
+    return {'name': code, 'code': code, 'course_type': lab_type, 'teachers': [teacher]}
+
+
+def solve(courses, rooms, **options):
+    teachers = pd.DataFrame([
+        {'Name': teacher, 'Course': course['name'], 'Course Code': course['code'],
+         'Course Type': course['course_type'], 'Department': 'Computer Science'}
+        for course in courses for teacher in course['teachers']
+    ])
+    rooms_df = pd.DataFrame([{'Room Name': name, 'Room Type': room_type, 'Capacity': 60} for name, room_type in rooms])
+    tables = ResourceTables(rooms_df, teachers)
+    occupancy = OccupancyIndex(SchedulingSettings.DAYS, SchedulingSettings.BASE_TIME_SLOTS,
+                               tables.room_names, tables.teacher_names)
+    for day, slot_start in SchedulingSettings.BLOCKED_SLOTS:
+        occupancy.block(day, slot_start)
+    return ConstraintSolver(occupancy, tables.suitable_rooms, seed=0, **options).solve(courses)
+
+
+# 6 days x 7 slots, minus the Friday 12:30 block
+FREE_SLOTS = 41
+ROOMS = [('Hall 1', 'Lecture Hall'), ('Hall 2', 'Lecture Hall'), ('Lab 1', 'Computing Lab'), ('Lab 2', 'Hardware Lab')]
+SLOT_STARTS = [slot['start'] for slot in SchedulingSettings.BASE_TIME_SLOTS]
+
+
+def cells(placement):
+    """(day, slot start) pairs a placement occupies"""
+    first = SLOT_STARTS.index(placement['time_slot']['start'])
+    return [(placement['day'], start) for start in SLOT_STARTS[first:first + placement['length']]]
+
+
+def test_placements_respect_the_hard_constraints():
+    courses = [theory(f'CS{i}', f'T{i % 4}', weekly_frequency=2) for i in range(12)]
+    courses += [lab(f'CL{i}', f'T{i % 4}') for i in range(4)] + [lab('EE1', 'T5', 'Hardware Lab')]
+    result = solve(courses, ROOMS)
+    assert not result.infeasible
+    assert len(result.placements) == 12 * 2 + 5
+
+    room_cells = Counter((p['room'],) + cell for p in result.placements for cell in cells(p))
+    teacher_cells = Counter((p['teacher'],) + cell for p in result.placements for cell in cells(p))
+    assert max(room_cells.values()) == 1
+    assert max(teacher_cells.values()) == 1
+    assert not any(cell == ('Friday', '12:30') for p in result.placements for cell in cells(p))
+
+    room_types = dict(ROOMS)
+    for p in result.placements:
+        course = p['course']
+        if course['course_type'] == 'Theory':
+            assert (p['length'], room_types[p['room']]) == (1, 'Lecture Hall')
+        else:
+            # Labs take two consecutive slots in a room of their own lab type
+            assert (p['length'], room_types[p['room']]) == (2, course['course_type'])
+            assert p['time_slot']['end'] == SchedulingSettings.BASE_TIME_SLOTS[
+                SLOT_STARTS.index(p['time_slot']['start']) + 1]['end']
+
+
+def test_sessions_of_a_course_keep_a_day_apart():
+    result = solve([theory(f'CS{i}', 'Solo', weekly_frequency=3) for i in range(4)], ROOMS)
+    assert not result.infeasible
+    day_index = {day: d for d, day in enumerate(SchedulingSettings.DAYS)}
+    by_course = {}
+    for p in result.placements:
+        by_course.setdefault(p['course']['code'], []).append(day_index[p['day']])
+    for days in by_course.values():
+        days.sort()
+        assert all(later - earlier > 1 for earlier, later in zip(days, days[1:]))
+
+
+def test_course_without_a_suitable_room_is_reported():
+    result = solve([lab('PHY1', 'T1', 'Physics Lab'), theory('CS1', 'T2')], ROOMS)
+    assert [p['course']['code'] for p in result.placements] == ['CS1']
+    assert result.infeasible[0]['reason'] == "no rooms suitable for course type 'Physics Lab'"
+
+
+def test_overfull_room_pool_is_reported_before_searching():
+    result = solve([theory(f'C{i}', f'T{i}') for i in range(60)], [('Hall 1', 'Lecture Hall')])
+    assert len(result.placements) == FREE_SLOTS
+    assert len(result.infeasible) == 60 - FREE_SLOTS
+    assert result.backtracks == 0
+    assert result.infeasible[0]['reason'].startswith('capacity exceeded for a pool of 1 suitable rooms')
+    # The surplus comes from the end of the input
+    assert {entry['course']['code'] for entry in result.infeasible} == {f'C{i}' for i in range(FREE_SLOTS, 60)}
+
+
+def test_overloaded_teacher_is_reported_before_searching():
+    rooms = [(f'Hall {i}', 'Lecture Hall') for i in range(5)]
+    result = solve([theory(f'C{i}', 'Solo') for i in range(50)], rooms)
+    assert len(result.placements) == FREE_SLOTS
+    assert result.backtracks == 0
+    assert all(entry['reason'].startswith('capacity exceeded for teacher Solo') for entry in result.infeasible)
+
+
+def test_session_that_keeps_failing_stops_backtracking():
+    # A fourth weekly session cannot keep a free day from the other three; the room has space for it
+    courses = [theory('MATH101', 'Solo', weekly_frequency=4)] + [theory(f'C{i}', f'T{i}') for i in range(30)]
+    result = solve(courses, [('Hall 1', 'Lecture Hall')], max_session_backtracks=3)
+    assert len(result.placements) == 33
+    assert [entry['course']['code'] for entry in result.infeasible] == ['MATH101']
+    assert result.backtracks <= 10
@@ -0,0 +1,45 @@
+import json
+
+from streaming_json import StreamingArrayParser
+
+ENTRIES = [
+    {'Day': 'Monday', 'StartTime': '08:00', 'CourseCode': 'CS101', 'Course': 'Intro {to} "CS"'},
+    {'Day': 'Tuesday', 'StartTime': '09:30', 'CourseCode': 'EE201', 'Course': 'Circuits \\ Labs'},
+]
+RESPONSE = "```json\n" + json.dumps(ENTRIES, indent=2) + "\n```"
+
+
+def feed_in_chunks(parser, text, size):
+    entries = []
+    for begin in range(0, len(text), size):
+        entries += parser.feed(text[begin:begin + size])
+    return entries
+
+
+def test_entries_survive_any_chunk_boundary():
+    for size in (1, 3, 7, len(RESPONSE)):
+        parser = StreamingArrayParser()
+        assert feed_in_chunks(parser, RESPONSE, size) == ENTRIES
+        assert not parser.pending and not parser.errors
+
+
+def test_truncated_response_keeps_completed_entries():
+    cut = RESPONSE.index('EE201')
+    parser = StreamingArrayParser()
+    assert feed_in_chunks(parser, RESPONSE[:cut], 5) == ENTRIES[:1]
+    assert parser.pending
+
+
+def test_truncation_inside_a_string_with_braces_stays_pending():
+    text = '[{"Course": "A"}, {"Course": "B {still open'
+    parser = StreamingArrayParser()
+    assert parser.feed(text) == [{'Course': 'A'}]
+    assert parser.pending
+
+
+def test_malformed_entry_is_collected_and_the_stream_goes_on():
+    parser = StreamingArrayParser()
+    entries = parser.feed('[{"Day": "Monday",}, {"Day": "Friday"}]')
+    assert entries == [{'Day': 'Friday'}]
+    assert parser.errors == ['{"Day": "Monday",}']
+    assert not parser.pending
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from timetable_validator import validate_timetable
+
+ROOMS = pd.DataFrame([
+    {'Room Name': 'Hall 1', 'Room Type': 'Lecture Hall', 'Capacity': 60},
+    {'Room Name': 'Lab 1', 'Room Type': 'Computing Lab', 'Capacity': 30},
+])
+
+
+def entry(code, day, start, end, room='Hall 1', teacher='Alice', course_type='Theory'):
+    return {'Day': day, 'StartTime': start, 'EndTime': end, 'CourseCode': code, 'Course': code,
+            'CourseType': course_type, 'Room': room, 'Teacher': teacher}
+
+
+def violations(*entries):
+    found = validate_timetable(pd.DataFrame(list(entries)), ROOMS)
+    return sorted(zip(found['Violation'], found['CourseCode']))
+
+
+def test_unreadable_and_backwards_times_are_reported_not_raised():
+    found = violations(
+        entry('CS101', 'Monday', '8am', '09:15'),
+        entry('CS102', 'Monday', '09:30', None, teacher='Bob'),
+        entry('CS103', 'Tuesday', '11:00', '09:45', teacher='Carol'),
+        entry('CS104', 'Tuesday', '25:00', '26:15', teacher='Dan'),
+    )
+    assert found == [('Invalid time', 'CS101'), ('Invalid time', 'CS102'),
+                     ('Invalid time', 'CS103'), ('Invalid time', 'CS104')]
+
+
+def test_invalid_rows_do_not_hide_clashes_between_valid_ones():
+    found = violations(
+        entry('CS101', 'Monday', '08:00', '09:15'),
+        entry('CS102', 'Monday', '08:30', '09:45', room='Hall 1', teacher='Bob'),
+        entry('CS103', 'Monday', 'soon', '09:00'),
+    )
+    assert found == [('Invalid time', 'CS103'), ('Room clash', 'CS102')]
+
+
+def test_clash_names_the_booking_that_is_still_running():
+    found = validate_timetable(pd.DataFrame([
+        entry('LONG', 'Monday', '08:00', '10:45', room='Lab 1', course_type='Computing Lab'),
+        entry('SHORT', 'Monday', '08:00', '08:30', room='Hall 1', teacher='Alice'),
+        entry('LATE', 'Monday', '09:30', '10:00', room='Hall 1', teacher='Alice'),
+    ]), ROOMS)
+    late = found[(found['CourseCode'] == 'LATE') & (found['Violation'] == 'Teacher clash')]
+    assert late['Details'].tolist() == ['Teacher already booked until 10:45 by LONG']
+
+
+def test_friday_break_and_room_type():
+    found = violations(
+        entry('CS101', 'Friday', '12:30', '13:45'),
+        entry('CS102', 'Monday', '08:00', '10:30', room='Hall 1', teacher='Bob', course_type='Computing Lab'),
+    )
+    assert found == [('Friday break', 'CS101'), ('Wrong room type', 'CS102')]
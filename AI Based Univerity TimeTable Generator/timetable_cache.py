@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def frame_fingerprint(df: pd.DataFrame) -> bytes:
+    """Digest of a DataFrame that ignores column order, row order and the index"""
+    normalized = df[sorted(df.columns, key=str)].astype(str)
+    normalized = normalized.sort_values(list(normalized.columns), kind='stable').reset_index(drop=True)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in normalized.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(normalized, index=False).values.tobytes())
+    return digest.digest()
+
+
+class TimetableCache:
+    """Persistent, content-addressed store of generated timetables.
+
+    Keys hash the normalized input sheets plus any generation parameters
+    (constraint text, model, temperature, mode), so identical requests map
+    to the same file. Entries are pickled one per file; reads refresh the
+    file's mtime and writes evict the least recently used files once the
+    directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str = '.timetable_cache', max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(*frames: pd.DataFrame, **params) -> str:
+        digest = hashlib.sha256()
+        for df in frames:
+            digest.update(frame_fingerprint(df))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            os.remove(path)
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key: str, value: Any):
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
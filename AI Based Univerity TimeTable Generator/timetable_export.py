@@ -0,0 +1,80 @@
+import io
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+import xlsxwriter
+
+EXCEL_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MIME = 'text/csv'
+PARQUET_MIME = 'application/vnd.apache.parquet'
+
+# Timetable columns that get one sheet per distinct value in the per-resource views
+DEFAULT_VIEWS = ('Teacher', 'Room', 'Day')
+MAX_COLUMN_WIDTH = 60
+
+
+def column_widths(df: pd.DataFrame) -> List[int]:
+    """Width per column from the longest header or cell text, computed column-wise"""
+    widths = []
+    for column in df.columns:
+        longest = df[column].astype(str).str.len().max() if len(df) else 0
+        widths.append(min(max(len(str(column)), int(longest)) + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _sheet_name(name: str, used: set) -> str:
+    # Excel sheet names: at most 31 characters, none of []:*?/\ and unique case-insensitively
+    base = re.sub(r'[\[\]:*?/\\]', '_', str(name)).strip("'")[:31] or 'Sheet'
+    candidate, counter = base, 1
+    while candidate.lower() in used:
+        counter += 1
+        suffix = f" ({counter})"
+        candidate = base[:31 - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+
+def sheet_views(df: pd.DataFrame, views: Iterable[str] = ()) -> Dict[str, pd.DataFrame]:
+    """The full timetable plus one sheet per distinct value of each view column"""
+    sheets = {'Timetable': df}
+    for column in views:
+        if column not in df.columns:
+            continue
+        for value, group in df.groupby(column, sort=True, observed=True):
+            sheets[f"{column} - {value}"] = group.drop(columns=column)
+    return sheets
+
+
+def to_excel_bytes(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """Write sheets to an in-memory workbook with xlsxwriter's constant-memory mode.
+
+    In constant-memory mode each row is flushed as soon as the next one
+    starts, so memory stays flat regardless of timetable size; rows are
+    therefore written strictly in order with write_row.
+    """
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True})
+    used = set()
+    for name, df in sheets.items():
+        worksheet = workbook.add_worksheet(_sheet_name(name, used))
+        for index, width in enumerate(column_widths(df)):
+            worksheet.set_column(index, index, width)
+        worksheet.write_row(0, 0, [str(column) for column in df.columns], header_format)
+        values = df.astype(object).where(df.notna(), None)
+        for row_number, row in enumerate(values.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def export_timetable(df: pd.DataFrame, file_format: str = 'xlsx', views: Iterable[str] = ()) -> Tuple[bytes, str]:
+    """Return (file bytes, MIME type) for a timetable in 'xlsx', 'csv' or 'parquet' format"""
+    if file_format == 'csv':
+        return df.to_csv(index=False).encode('utf-8'), CSV_MIME
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue(), PARQUET_MIME
+    return to_excel_bytes(sheet_views(df, views)), EXCEL_MIME
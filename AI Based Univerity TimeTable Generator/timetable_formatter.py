@@ -0,0 +1,40 @@
+from typing import List
+
+import pandas as pd
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+TIMETABLE_COLUMNS = ['Day', 'StartTime', 'EndTime', 'CourseCode', 'Course', 'CourseType', 'Room', 'Teacher']
+
+
+def schedule_to_timetable(scheduled_courses: List[dict]) -> pd.DataFrame:
+    """ScheduledCourse records (one per session) -> sorted timetable DataFrame"""
+    return _sorted_timetable(pd.DataFrame([
+        {
+            'Day': course.get('assigned_day'),
+            'StartTime': (course.get('assigned_time_slot') or {}).get('start'),
+            'EndTime': (course.get('assigned_time_slot') or {}).get('end'),
+            'CourseCode': course.get('code'),
+            'Course': course.get('name'),
+            'CourseType': course.get('course_type'),
+            'Room': course.get('assigned_room'),
+            'Teacher': course.get('assigned_teacher'),
+        }
+        for course in scheduled_courses
+    ]))
+
+
+def _sorted_timetable(timetable_df: pd.DataFrame) -> pd.DataFrame:
+    if timetable_df.empty:
+        raise ValueError("No scheduled sessions found in the plan")
+    # Known columns first in a fixed order, anything extra after them
+    columns = [c for c in TIMETABLE_COLUMNS if c in timetable_df.columns]
+    timetable_df = timetable_df[columns + [c for c in timetable_df.columns if c not in columns]]
+    if 'Day' in timetable_df.columns:
+        day_rank = timetable_df['Day'].map({day: rank for rank, day in enumerate(DAY_ORDER)})
+        sort_keys = ['StartTime'] if 'StartTime' in timetable_df.columns else []
+        timetable_df = (
+            timetable_df.assign(_day_rank=day_rank)
+            .sort_values(['_day_rank'] + sort_keys, kind='stable')
+            .drop(columns='_day_rank')
+        )
+    return timetable_df.reset_index(drop=True)
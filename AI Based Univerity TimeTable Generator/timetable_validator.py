@@ -0,0 +1,101 @@
+import pandas as pd
+
+from resource_tables import ROOM_TYPE_MAPPING
+
+VIOLATION_COLUMNS = ['Violation', 'Day', 'StartTime', 'EndTime', 'CourseCode', 'Room', 'Teacher', 'Details']
+
+
+def to_minutes(times: pd.Series) -> pd.Series:
+    """Vectorized 'HH:MM' (or 'HH:MM:SS') -> minutes since midnight, NaN where the value is not a valid time.
+
+    A timetable repeats a handful of slot times, so each distinct value is
+    parsed once and the result is broadcast back to every row.
+    """
+    codes, distinct = pd.factorize(times.astype(str))
+    parts = pd.Series(distinct, dtype=object).str.extract(r'^\s*(\d{1,2}):(\d{2})(?::\d{2})?\s*$')
+    hours = pd.to_numeric(parts[0], errors='coerce')
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    parsed = (hours * 60 + minutes).where((hours < 24) & (minutes < 60))
+    # Missing values get code -1
+    return pd.Series(parsed.to_numpy(dtype=float)[codes], index=times.index).where(codes >= 0)
+
+
+def from_minutes(minutes: pd.Series) -> pd.Series:
+    """Vectorized minutes since midnight -> 'HH:MM'"""
+    minutes = minutes.fillna(0).astype(int)
+    return (minutes // 60).astype(str).str.zfill(2) + ':' + (minutes % 60).astype(str).str.zfill(2)
+
+
+def _flag(df: pd.DataFrame, mask: pd.Series, violation: str, details) -> pd.DataFrame:
+    flagged = df.loc[mask, ['Day', 'StartTime', 'EndTime', 'CourseCode', 'Room', 'Teacher']].copy()
+    flagged.insert(0, 'Violation', violation)
+    flagged['Details'] = details[mask] if isinstance(details, pd.Series) else details
+    return flagged
+
+
+def _overlaps(df: pd.DataFrame, resource: str) -> pd.DataFrame:
+    """Entries that start before an earlier entry on the same day and resource has ended.
+
+    Rows are sorted by (day, resource, start); within each group the running
+    maximum end time of the preceding rows is compared to each row's start,
+    so the whole check is a sort plus a few grouped cumulative passes. The
+    booking reported is the one that set that running maximum.
+    """
+    ordered = df.sort_values(['Day', resource, 'start', 'end'], kind='stable')
+    keys = [ordered['Day'], ordered[resource]]
+    running_end = ordered.groupby(keys, sort=False)['end'].cummax()
+    # Course code of the row holding the running maximum, carried forward to the rows after it
+    holder = ordered['CourseCode'].astype(object).where(ordered['end'] == running_end)
+    holder = holder.groupby(keys, sort=False).ffill()
+    busy_until = running_end.groupby(keys, sort=False).shift()
+    blocker = holder.groupby(keys, sort=False).shift()
+    clash = ordered['start'] < busy_until
+    details = f"{resource} already booked until " + from_minutes(busy_until) + " by " + blocker.fillna('').astype(str)
+    return _flag(ordered, clash, f"{resource} clash", details)
+
+
+def validate_timetable(timetable_df: pd.DataFrame, rooms_df: pd.DataFrame = None, max_daily_classes: int = 3,
+                       friday_break=("12:30", "14:00")) -> pd.DataFrame:
+    """Check an LLM-produced timetable against the hard constraints.
+
+    Reports every room clash, teacher clash, wrong room type, Friday break
+    violation and per-day teacher overload as one row per offending entry.
+    Entries whose times cannot be read, or that end before they start, are
+    reported as invalid and left out of the time-based checks.
+    """
+    if timetable_df.empty:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+    df = timetable_df.reset_index(drop=True)
+    df = df.assign(start=to_minutes(df['StartTime']), end=to_minutes(df['EndTime']))
+    unreadable = df['start'].isna() | df['end'].isna()
+    backwards = ~unreadable & (df['end'] <= df['start'])
+    found = [
+        _flag(df, unreadable, "Invalid time", "StartTime and EndTime must be HH:MM"),
+        _flag(df, backwards, "Invalid time", "ends at or before its start"),
+    ]
+    timed = df[~(unreadable | backwards)]
+    found += [_overlaps(timed, 'Room'), _overlaps(timed, 'Teacher')]
+
+    if rooms_df is not None:
+        room_types = rooms_df.drop_duplicates('Room Name').set_index('Room Name')['Room Type'].astype(object)
+        actual = df['Room'].map(room_types)
+        expected = df['CourseType'].map(ROOM_TYPE_MAPPING).fillna('Lecture Hall')
+        found.append(_flag(df, actual.isna(), "Unknown room", "room is not in the rooms sheet"))
+        found.append(_flag(
+            df, actual.notna() & (actual != expected), "Wrong room type",
+            "needs " + expected + ", room is " + actual.fillna('')
+        ))
+
+    break_start, break_end = (to_minutes(pd.Series(list(friday_break)))).tolist()
+    in_break = (timed['Day'] == 'Friday') & (timed['start'] < break_end) & (timed['end'] > break_start)
+    found.append(_flag(timed, in_break, "Friday break", f"overlaps the {friday_break[0]}-{friday_break[1]} break"))
+
+    daily = df.groupby(['Teacher', 'Day'])['CourseCode'].transform('size')
+    found.append(_flag(
+        df, daily > max_daily_classes, "Teacher daily load",
+        daily.astype(str) + f" classes that day (max {max_daily_classes})"
+    ))
+
+    violations = pd.concat(found)
+    return violations.sort_index(kind='stable').reset_index(drop=True)[VIOLATION_COLUMNS]
@@ -1,17 +1,20 @@
 # conda activate "D:\Python_Projects\B5 AI\ChatPDF\chatpdfb5"
 
 import streamlit as st
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import sys
 import google.generativeai as genai
-from langchain_community.vectorstores import FAISS
 # from langchain.vectorstore import FAISS
 from langchain.chains.question_answering import load_qa_chain
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rag_common.embedding_service import default_embeddings
+from pdf_extraction import iter_chunks, iter_pages
+from index_manager import IndexManager
+from retrieval_service import RetrievalService
 
 
 load_dotenv()
@@ -19,24 +22,27 @@ os.getenv("GOOGLE_API_KEY")
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 
-def get_pdf_text(pdf_docs):
-    text = ""
-    for pdf in pdf_docs:
-        pdf_reader = PdfReader(pdf)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
+@st.cache_resource
+def get_index_manager():
+    # One per process, so reruns and questions never reload the index; the FAISS store itself loads on first change
+    # Batched, rate-limited client; an interrupted ingest resumes from the checkpointed batches
+    embeddings = default_embeddings("models/embedding-001", checkpoint_dir="faiss_index/.embedding_checkpoint",
+                                    cache_dir=".embedding_cache", task_type="retrieval_document")
+    return IndexManager(embeddings, "faiss_index")
 
 
-def get_text_chunks(text):
+def get_pdf_text(pdf_docs, skip=()):
+    # Lazily yields one record per page; pages are extracted across a process pool
+    return iter_pages(pdf_docs, skip=skip)
+
+
+def get_text_chunks(pages):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size =10000, chunk_overlap = 1000)
-    chunks = text_splitter.split_text(text)
-    return chunks
+    return iter_chunks(pages, text_splitter)
 
-def get_vector_store(text_chunks):
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001",task_type="retrieval_document")
-    vector_store = FAISS.from_texts(text_chunks, embedding= embeddings)
-    vector_store.save_local("faiss_index")
+def get_vector_store(index_manager, text_chunks):
+    # Only chunks not already in the index are embedded and appended
+    return index_manager.add_chunks(text_chunks)
 
 def get_converstional_chain():
      prompt_template = """"
@@ -57,17 +63,16 @@ def get_converstional_chain():
 
 
 
-def user_input(user_question):
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+@st.cache_resource
+def get_retrieval_service():
+    # One per process: the index is memory-mapped once and reloaded only when its version changes;
+    # repeated questions are answered from the on-disk embedding cache
+    embeddings = default_embeddings("models/embedding-001", cache_dir=".embedding_cache")
+    return RetrievalService(embeddings, get_converstional_chain, "faiss_index")
 
-    new_db = FAISS.load_local("faiss_index", embeddings, allow_dangerous_deserialization=True)
-    docs = new_db.similarity_search(user_question)
 
-    chain = get_converstional_chain()
-
-    response = chain(
-        {"input_documents": docs, "question": user_question},
-        return_only_outputs=True)
+def user_input(user_question):
+    response = get_retrieval_service().answer(user_question)
     print(response)
     st.write("Reply: ", response["output_text"])
 
@@ -85,12 +90,25 @@ def main():
     with st.sidebar:
         st.title("Menu")
         pdf_docs = st.file_uploader("Upload your pdf files and click on the submit and process button", accept_multiple_files= True)
+        index_manager = get_index_manager()
         if st.button("Submit and Process"):
             with st.spinner("Processing"):
-                raw_text = get_pdf_text(pdf_docs)
-                text_chunks = get_text_chunks(raw_text)
-                get_vector_store(text_chunks)
-                st.success("Done")
+                pages = get_pdf_text(pdf_docs, skip=index_manager.document_ids())
+                text_chunks = get_text_chunks(pages)
+                report = get_vector_store(index_manager, text_chunks)
+                st.success(
+                    f"Done: {report['documents_added']} new documents, {report['chunks_added']} chunks embedded, "
+                    f"{report['chunks_skipped']} already indexed"
+                )
+
+        st.subheader("Indexed documents")
+        for document in index_manager.documents():
+            col1, col2 = st.columns([4, 1])
+            col1.write(f"{document['name']} ({document['chunks']} chunks)")
+            if col2.button("Delete", key=f"delete_{document['doc_id']}"):
+                index_manager.delete_document(document['doc_id'])
+                st.rerun()
+        st.caption(f"Embedding cache: {index_manager.embeddings.cache.stats()}")
 
 
 
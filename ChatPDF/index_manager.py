@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from langchain_community.vectorstores import FAISS
+
+
+def chunk_id(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class IndexManager:
+    """Keeps a persistent FAISS index in step with the uploaded documents.
+
+    A manifest next to the index records which documents (by content hash)
+    are indexed and which chunk ids each contributed. Chunk ids are hashes
+    of the chunk text, so content already in the index - a re-uploaded
+    file or boilerplate shared between files - is never embedded twice.
+    New vectors are appended to the existing index, and a document can be
+    removed by id; chunks shared with another document stay until their
+    last document is deleted, and their source metadata is handed to a
+    remaining owner. Every change bumps the manifest version.
+    Listing documents reads only the manifest; the FAISS store itself is
+    loaded on the first add or delete.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, embeddings, folder: str = 'faiss_index'):
+        self.embeddings = embeddings
+        self.folder = folder
+        self.manifest = self._read_manifest()
+        self.store: Optional[FAISS] = None
+        self.store_loaded = False
+        # One manager is shared by every session of the app process
+        self.lock = threading.Lock()
+
+    def _load_store(self) -> Optional[FAISS]:
+        if not self.store_loaded:
+            if os.path.exists(os.path.join(self.folder, 'index.faiss')):
+                self.store = FAISS.load_local(self.folder, self.embeddings, allow_dangerous_deserialization=True)
+            self.store_loaded = True
+        return self.store
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.folder, self.MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'version': 0, 'documents': {}}
+
+    def _save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        if self.store is not None:
+            # Save beside the index and rename over it: readers may have the old file memory-mapped,
+            # and FAISS would otherwise truncate it in place
+            staging = os.path.join(self.folder, '.staging')
+            self.store.save_local(staging)
+            for name in ('index.faiss', 'index.pkl'):
+                os.replace(os.path.join(staging, name), os.path.join(self.folder, name))
+        self.manifest['version'] += 1
+        # Write-then-rename so readers never see a half-written manifest
+        path = os.path.join(self.folder, self.MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(path + '.tmp', path)
+
+    @property
+    def version(self) -> int:
+        return self.manifest['version']
+
+    def document_ids(self) -> set:
+        return set(self.manifest['documents'])
+
+    def documents(self) -> List[Dict]:
+        return [
+            {'doc_id': doc_id, 'name': entry['name'], 'chunks': len(entry['chunk_ids'])}
+            for doc_id, entry in self.manifest['documents'].items()
+        ]
+
+    def _indexed_chunk_ids(self) -> set:
+        return set(self.store.index_to_docstore_id.values()) if self.store is not None else set()
+
+    def add_chunks(self, chunks: Iterable[Dict]) -> Dict:
+        """Embed and append only chunks not already indexed; chunks are {'doc_id', 'name', 'page', 'text'}"""
+        with self.lock:
+            return self._add_chunks(chunks)
+
+    def _add_chunks(self, chunks: Iterable[Dict]) -> Dict:
+        self._load_store()
+        indexed = self._indexed_chunk_ids()
+        documents = self.manifest['documents']
+        texts, metadatas, ids = [], [], []
+        report = {'documents_added': 0, 'documents_skipped': 0, 'chunks_added': 0, 'chunks_skipped': 0}
+        doc_chunks = {}
+
+        for chunk in chunks:
+            doc_id = chunk['doc_id']
+            if doc_id not in doc_chunks:
+                if doc_id in documents:
+                    report['documents_skipped'] += 1
+                else:
+                    report['documents_added'] += 1
+                    documents[doc_id] = {'name': chunk['name'], 'chunk_ids': []}
+                doc_chunks[doc_id] = set(documents[doc_id]['chunk_ids'])
+            cid = chunk_id(chunk['text'])
+            new_for_document = cid not in doc_chunks[doc_id]
+            if new_for_document:
+                doc_chunks[doc_id].add(cid)
+                documents[doc_id]['chunk_ids'].append(cid)
+            if cid in indexed:
+                if new_for_document:
+                    # The vector carries another document's metadata; keep this page for when that one is deleted
+                    documents[doc_id].setdefault('pages', {})[cid] = chunk['page']
+                report['chunks_skipped'] += 1
+                continue
+            indexed.add(cid)
+            texts.append(chunk['text'])
+            metadatas.append({'doc_id': doc_id, 'name': chunk['name'], 'page': chunk['page']})
+            ids.append(cid)
+
+        if texts:
+            if self.store is None:
+                self.store = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas, ids=ids)
+            else:
+                self.store.add_texts(texts, metadatas=metadatas, ids=ids)
+            report['chunks_added'] = len(texts)
+        if texts or report['documents_added']:
+            self._save()
+        return report
+
+    def delete_document(self, doc_id: str) -> int:
+        """Remove a document and every chunk no other document still uses; returns vectors removed"""
+        with self.lock:
+            return self._delete_document(doc_id)
+
+    def _delete_document(self, doc_id: str) -> int:
+        entry = self.manifest['documents'].pop(doc_id, None)
+        if entry is None:
+            return 0
+        self._load_store()
+        still_used = {cid for other in self.manifest['documents'].values() for cid in other['chunk_ids']}
+        indexed = self._indexed_chunk_ids()
+        removable = [cid for cid in entry['chunk_ids'] if cid not in still_used and cid in indexed]
+        if removable:
+            self.store.delete(removable)
+        self._reassign_shared(doc_id, [cid for cid in entry['chunk_ids'] if cid in still_used and cid in indexed])
+        self._save()
+        return len(removable)
+
+    def _reassign_shared(self, doc_id: str, shared: List[str]):
+        """Point chunks that cited the deleted document at a document that still contains them"""
+        cited = {cid for cid in shared if self.store.docstore.search(cid).metadata.get('doc_id') == doc_id}
+        if not cited:
+            return
+        owners = {}
+        for owner_id, owner in self.manifest['documents'].items():
+            for cid in cited.intersection(owner['chunk_ids']).difference(owners):
+                owners[cid] = owner_id
+        for cid, owner_id in owners.items():
+            owner = self.manifest['documents'][owner_id]
+            self.store.docstore.search(cid).metadata.update({
+                'doc_id': owner_id,
+                'name': owner['name'],
+                # The stored vector now carries this page, so the manifest no longer needs it
+                'page': owner.get('pages', {}).pop(cid, None),
+            })
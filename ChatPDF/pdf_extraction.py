@@ -0,0 +1,105 @@
+import hashlib
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Collection, Dict, Iterable, Iterator, List, Tuple
+
+from PyPDF2 import PdfReader
+
+
+def _extract_range(task: Tuple[str, str, int, int]) -> List[Dict]:
+    """Worker: text of pages [start, stop) of one PDF on disk"""
+    doc_id, path, start, stop = task
+    reader = PdfReader(path)
+    return [
+        {'doc_id': doc_id, 'page': number + 1, 'text': reader.pages[number].extract_text() or ''}
+        for number in range(start, stop)
+    ]
+
+
+def iter_pages(pdf_docs: Iterable, max_workers: int = None, pages_per_task: int = 16,
+               skip: Collection[str] = ()) -> Iterator[Dict]:
+    """Yield {'doc_id', 'name', 'page', 'text'} for every page of every upload, in order.
+
+    Each upload is spooled to a temporary file once and identified by the
+    SHA-256 of its bytes. Page ranges are extracted in a process pool with
+    at most two tasks per worker in flight, so only a few ranges of text are
+    held in memory at a time however large the upload. Small uploads are
+    extracted in-process to skip the pool start-up cost. Documents whose id
+    is in `skip` (already indexed) are not extracted at all.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    spooled, tasks, names = [], [], {}
+    try:
+        for pdf in pdf_docs:
+            data = pdf.getvalue() if hasattr(pdf, 'getvalue') else pdf.read()
+            doc_id = hashlib.sha256(data).hexdigest()
+            if doc_id in names or doc_id in skip:
+                continue  # the same file uploaded twice, or already indexed
+            names[doc_id] = getattr(pdf, 'name', doc_id)
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+                f.write(data)
+            spooled.append(f.name)
+            page_count = len(PdfReader(f.name).pages)
+            tasks.extend(
+                (doc_id, f.name, start, min(start + pages_per_task, page_count))
+                for start in range(0, page_count, pages_per_task)
+            )
+
+        if max_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                for record in _extract_range(task):
+                    yield {**record, 'name': names[record['doc_id']]}
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            pending, remaining = deque(), iter(tasks)
+            for task in remaining:
+                pending.append(pool.submit(_extract_range, task))
+                if len(pending) >= 2 * max_workers:
+                    break
+            while pending:
+                records = pending.popleft().result()
+                next_task = next(remaining, None)
+                if next_task is not None:
+                    pending.append(pool.submit(_extract_range, next_task))
+                for record in records:
+                    yield {**record, 'name': names[record['doc_id']]}
+    finally:
+        for path in spooled:
+            os.remove(path)
+
+
+def iter_chunks(pages: Iterable[Dict], text_splitter, flush_chars: int = 40000) -> Iterator[Dict]:
+    """Split page records into chunks incrementally, one document at a time.
+
+    Page texts are buffered as a list and joined once per flush. When the
+    buffer passes `flush_chars` (a few chunk sizes) it is split and every
+    chunk but the last is emitted; the last one is carried over so chunk
+    boundaries and overlap closely match splitting the whole document at
+    once, while memory stays bounded by a few chunks. Each chunk records its document and the page
+    the buffer started on.
+    """
+    doc_id, name, first_page, parts, size = None, None, None, [], 0
+
+    def flush(final):
+        chunks = text_splitter.split_text("".join(parts))
+        keep = chunks if final else chunks[:-1]
+        for text in keep:
+            yield {'doc_id': doc_id, 'name': name, 'page': first_page, 'text': text}
+        return [] if final or not chunks else [chunks[-1]]
+
+    for page in pages:
+        if page['doc_id'] != doc_id:
+            if parts:
+                yield from flush(final=True)
+            doc_id, name, first_page, parts, size = page['doc_id'], page['name'], page['page'], [], 0
+        parts.append(page['text'])
+        size += len(page['text'])
+        if size >= flush_chars:
+            parts = yield from flush(final=False)
+            size = sum(len(part) for part in parts)
+            first_page = page['page']
+    if parts:
+        yield from flush(final=True)
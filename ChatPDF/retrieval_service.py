@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+import pickle
+import threading
+from typing import Callable, Dict, List, Optional
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from index_manager import IndexManager
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalService:
+    """Answers questions from the persisted FAISS index, loaded once per process.
+
+    The index file is memory-mapped rather than read into memory, and the
+    embeddings client and QA chain are built once and kept warm. Before
+    each question the manifest version written by IndexManager is checked;
+    the index is reloaded only when it has changed on disk.
+    """
+
+    def __init__(self, embeddings, chain_factory: Callable, folder: str = 'faiss_index'):
+        self.embeddings = embeddings
+        self.chain = chain_factory()
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.store: Optional[FAISS] = None
+        self.loaded_version: Optional[int] = None
+        self.loads = 0
+
+    def _disk_version(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.folder, IndexManager.MANIFEST)) as f:
+                return json.load(f)['version']
+        except FileNotFoundError:
+            return None
+
+    def _load(self, version: int):
+        index = faiss.read_index(os.path.join(self.folder, 'index.faiss'), faiss.IO_FLAG_MMAP)
+        with open(os.path.join(self.folder, 'index.pkl'), 'rb') as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        self.store = FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+        self.loaded_version = version
+        self.loads += 1
+        logger.info(f"Loaded FAISS index version {version} ({index.ntotal} vectors)")
+
+    def vector_store(self) -> Optional[FAISS]:
+        """The current index, reloaded first if a newer version was saved; None before the first ingest"""
+        version = self._disk_version()
+        if version is not None and version != self.loaded_version:
+            with self.lock:
+                if version != self.loaded_version and os.path.exists(os.path.join(self.folder, 'index.faiss')):
+                    self._load(version)
+        return self.store
+
+    def search(self, question: str, k: int = 4) -> List:
+        store = self.vector_store()
+        return store.similarity_search(question, k=k) if store is not None else []
+
+    def answer(self, question: str) -> Dict:
+        docs = self.search(question)
+        return self.chain({"input_documents": docs, "question": question}, return_only_outputs=True)
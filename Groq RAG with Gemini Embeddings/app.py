@@ -2,6 +2,7 @@
 
 import streamlit as st
 import os
+import sys
 from langchain_groq import ChatGroq
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.chains.combine_documents import create_stuff_documents_chain
@@ -9,8 +10,9 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains import create_retrieval_chain
 from langchain_community.vectorstores import FAISS
 from langchain_community.document_loaders import PyPDFDirectoryLoader
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from dotenv import load_dotenv
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rag_common.embedding_service import default_embeddings
 from groq import Groq
 load_dotenv()
 
@@ -36,7 +38,8 @@ Questions: {input}
 
 def vector_embedding():
     if "vectors" not in st.session_state:
-        st.session_state.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        st.session_state.embeddings = default_embeddings("models/embedding-001", checkpoint_dir=".embedding_checkpoint",
+                                                         cache_dir=".embedding_cache")
         st.session_state.loader = PyPDFDirectoryLoader("./data")
         st.session_state.docs = st.session_state.loader.load()
         st.session_state.text_splitter = RecursiveCharacterTextSplitter(chunk_size = 1000,chunk_overlap = 200)
@@ -48,6 +51,7 @@ prompt1 = st.text_input("Enter your Questions from Directory")
 if st.button("Documents Embeddings"):
     vector_embedding()
     st.write("Vector Store DB is ready to use..")
+    st.caption(f"Embedding cache: {st.session_state.embeddings.cache.stats()}")
 
 import time
 
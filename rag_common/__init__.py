@@ -0,0 +1,5 @@
+"""Code shared by the RAG apps (ChatPDF, Groq RAG with Gemini Embeddings, Agentic RAG).
+
+The apps are run from their own folders, so each one appends the
+repository root to sys.path before importing from this package.
+"""
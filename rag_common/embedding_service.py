@@ -0,0 +1,313 @@
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Exception class names (google.api_core, httpx, requests, grpc) that mean "try again later"
+TRANSIENT_ERROR_NAMES = ('ResourceExhausted', 'TooManyRequests', 'RateLimit', 'Timeout', 'DeadlineExceeded',
+                         'ServiceUnavailable', 'InternalServerError', 'BadGateway', 'GatewayTimeout')
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for rate limits, timeouts and 5xx server errors, including when wrapped by the client library.
+
+    An HTTP status on the error decides (429 or 5xx); otherwise the
+    exception class names are matched. Anything else, such as a bad API
+    key or an invalid request, is not worth retrying.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, TimeoutError):
+            return True
+        response = getattr(error, 'response', None)
+        for status in (getattr(error, 'code', None), getattr(error, 'status_code', None),
+                       getattr(response, 'status_code', None)):
+            if isinstance(status, int) and not isinstance(status, bool):
+                return status == 429 or 500 <= status < 600
+        if any(name in cls.__name__ for cls in type(error).__mro__ for name in TRANSIENT_ERROR_NAMES):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class TokenBucket:
+    """Thread-safe limiter allowing `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class EmbeddingCache:
+    """Disk-backed LRU cache of embedding vectors for one model.
+
+    Entries are keyed by the SHA-256 of the model name and the text. Vectors
+    live in a memory-mapped float32 matrix (`vectors.f32`) that grows as
+    needed up to `max_entries` rows. A SQLite index (`index.sqlite`) maps
+    each key to its row and a last-used counter; every put and every batch
+    of hits updates only the rows it touched, so recency survives a restart
+    and writes stay small however large the cache is. When full, the least
+    recently used row is overwritten. Use `EmbeddingCache.open` so every
+    caller in a process shares one instance per directory and model.
+    """
+
+    VECTORS = 'vectors.f32'
+    INDEX = 'index.sqlite'
+    _instances: Dict[str, 'EmbeddingCache'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: str, model: str, max_entries: int = 50000):
+        self.model = model
+        self.folder = os.path.join(directory, hashlib.sha256(model.encode('utf-8')).hexdigest()[:16])
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.matrix: Optional[np.memmap] = None
+        os.makedirs(self.folder, exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(self.folder, self.INDEX), check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, row INTEGER NOT NULL, used INTEGER NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        dim = self.db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim: Optional[int] = int(dim[0]) if dim else None
+        # Least to most recently used, as in the index
+        self.rows: 'OrderedDict[str, int]' = OrderedDict(
+            self.db.execute("SELECT key, row FROM entries ORDER BY used")
+        )
+        self.clock = self.db.execute("SELECT COALESCE(MAX(used), 0) FROM entries").fetchone()[0]
+        path = os.path.join(self.folder, self.VECTORS)
+        if self.dim and os.path.exists(path):
+            rows = os.path.getsize(path) // (4 * self.dim)
+            self.matrix = np.memmap(path, dtype=np.float32, mode='r+', shape=(rows, self.dim))
+
+    @classmethod
+    def open(cls, directory: str, model: str, max_entries: int = 50000) -> 'EmbeddingCache':
+        with cls._instances_lock:
+            path = os.path.join(os.path.abspath(directory), model)
+            if path not in cls._instances:
+                cls._instances[path] = cls(directory, model, max_entries)
+            return cls._instances[path]
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _touch(self, key: str) -> int:
+        self.rows.move_to_end(key)
+        self.clock += 1
+        return self.clock
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per text, or None for a miss; hits become most recently used"""
+        found, used = [], []
+        with self.lock:
+            for text in texts:
+                key = self.key(text)
+                row = self.rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    used.append((self._touch(key), key))
+                    found.append(np.array(self.matrix[row]))
+            if used:
+                with self.db:
+                    self.db.executemany("UPDATE entries SET used = ? WHERE key = ?", used)
+        return found
+
+    def _reserve(self, needed: int):
+        """Grow the memmap geometrically so it holds `needed` rows"""
+        allocated = 0 if self.matrix is None else len(self.matrix)
+        if needed <= allocated:
+            return
+        size = min(self.max_entries, max(needed, 2 * allocated, 1024))
+        path = os.path.join(self.folder, self.VECTORS)
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(path, 'ab') as f:
+            f.truncate(size * self.dim * 4)
+        self.matrix = np.memmap(path, dtype=np.float32, mode='r+', shape=(size, self.dim))
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        with self.lock:
+            meta, written, evicted = [], [], []
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                meta.append(('dim', str(self.dim)))
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self.rows:
+                    row = self.rows[key]
+                elif len(self.rows) < self.max_entries:
+                    row = len(self.rows)
+                    self._reserve(row + 1)
+                    self.rows[key] = row
+                else:
+                    old_key, row = self.rows.popitem(last=False)
+                    evicted.append((old_key,))
+                    self.rows[key] = row
+                self.matrix[row] = vector
+                written.append((key, row, self._touch(key)))
+            # Vectors reach the file before the index points at them
+            self.matrix.flush()
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta)
+                self.db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+                self.db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", written)
+
+    def stats(self) -> Dict:
+        return {'entries': len(self.rows), 'hits': self.hits, 'misses': self.misses}
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic offline embeddings: unit vectors seeded by a hash of the text"""
+
+    def __init__(self, size: int = 768):
+        self.size = size
+
+    def embed_query(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+        vector = np.random.default_rng(seed).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class BatchedEmbeddings(Embeddings):
+    """Wraps an embeddings client with batching, concurrency, rate limiting and retries.
+
+    Texts are sent in batches of at most `batch_size` (the API's per-request
+    limit), up to `max_concurrency` batches at a time, each request first
+    taking a token from a `requests_per_minute` bucket. Transient failures
+    (rate limits, timeouts, server errors) are retried with exponential
+    backoff and jitter; any other error is raised at once. When
+    `checkpoint_dir` is set, every finished batch is saved there under a
+    hash of its texts, so an interrupted ingest resumes from the batches it
+    had already embedded;
+    the checkpoint files are removed once the whole call succeeds. With a
+    `cache`, texts already embedded (and repeated texts within a call) are
+    served from it and only the rest go over the network.
+    """
+
+    def __init__(self, client: Embeddings, batch_size: int = 100, max_concurrency: int = 4,
+                 requests_per_minute: int = 120, max_retries: int = 6, base_delay: float = 1.0,
+                 checkpoint_dir: str = None, cache: EmbeddingCache = None):
+        self.client = client
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(requests_per_minute / 60, capacity=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.checkpoint_dir = checkpoint_dir
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _with_retry(self, call, *args):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return call(*args)
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient(e):
+                    raise
+                delay = self.base_delay * 2 ** attempt * (0.5 + random.random())
+                logger.warning(f"Embedding request failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _checkpoint_path(self, batch: List[str]) -> str:
+        digest = hashlib.sha256("\x00".join(batch).encode('utf-8')).hexdigest()
+        return os.path.join(self.checkpoint_dir, f"{digest}.npy")
+
+    def _embed_batch(self, batch: List[str]) -> np.ndarray:
+        path = self._checkpoint_path(batch) if self.checkpoint_dir else None
+        if path and os.path.exists(path):
+            return np.load(path)
+        vectors = np.asarray(self._with_retry(self.client.embed_documents, batch), dtype=np.float32)
+        if path:
+            np.save(path + '.tmp.npy', vectors)
+            os.replace(path + '.tmp.npy', path)
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is None:
+            return self._embed_all(texts)
+        vectors = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            embedded = dict(zip(missing, self._embed_all(missing)))
+            self.cache.put_many(missing, [embedded[text] for text in missing])
+            vectors = [embedded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
+
+    def _embed_all(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if not batches:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            results = list(pool.map(self._embed_batch, batches))
+        if self.checkpoint_dir:
+            for batch in batches:
+                path = self._checkpoint_path(batch)
+                if os.path.exists(path):
+                    os.remove(path)
+        return np.concatenate(results).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.cache is None:
+            return self._with_retry(self.client.embed_query, text)
+        vector = self.cache.get_many([text])[0]
+        if vector is None:
+            vector = np.asarray(self._with_retry(self.client.embed_query, text), dtype=np.float32)
+            self.cache.put_many([text], [vector])
+        return vector.tolist()
+
+
+def default_embeddings(model: str = "models/embedding-001", checkpoint_dir: str = None, cache_dir: str = None,
+                       **client_options) -> BatchedEmbeddings:
+    """Batched Google embeddings, or FakeEmbeddings when USE_FAKE_EMBEDDINGS=1 for offline runs"""
+    fake = os.getenv('USE_FAKE_EMBEDDINGS') == '1'
+    if fake:
+        client = FakeEmbeddings()
+    else:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        client = GoogleGenerativeAIEmbeddings(model=model, **client_options)
+    cache = None
+    if cache_dir:
+        # Vectors depend on the task type too, so it is part of the cache's model name
+        name = ':'.join(filter(None, ['fake' if fake else model, client_options.get('task_type')]))
+        cache = EmbeddingCache.open(cache_dir, name)
+    return BatchedEmbeddings(client, checkpoint_dir=checkpoint_dir, cache=cache)